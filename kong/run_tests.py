@@ -11,6 +11,11 @@ from nose import config
 from nose import result
 from nose import core
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from tempest.common import durations
+
 
 class _AnsiColorizer(object):
     """
@@ -137,9 +142,14 @@ def get_elapsed_time_color(elapsed_time):
 class KongTestResult(result.TextTestResult):
     def __init__(self, *args, **kw):
         self.show_elapsed = kw.pop('show_elapsed')
+        durations_file = kw.pop('durations_file', None)
         result.TextTestResult.__init__(self, *args, **kw)
         self.num_slow_tests = 5
         self.slow_tests = []  # this is a fixed-sized heap
+        # every test's duration, kept across runs if a file is given
+        self.durations = None
+        if durations_file:
+            self.durations = durations.DurationHistory(durations_file)
         self._last_case = None
         self.colorizer = None
         # NOTE(vish, tfukushima): reset stdout for the terminal check
@@ -160,8 +170,10 @@ class KongTestResult(result.TextTestResult):
     def getDescription(self, test):
         return str(test)
 
-    def _handleElapsedTime(self, test):
+    def _handleElapsedTime(self, test, failed=False, skipped=False):
         self.elapsed_time = time.time() - self.start_time
+        if self.durations is not None and not skipped:
+            self.durations.record(test.id(), self.elapsed_time, failed)
         item = (self.elapsed_time, test)
         # Record only the n-slowest tests using heap
         if len(self.slow_tests) >= self.num_slow_tests:
@@ -192,7 +204,7 @@ class KongTestResult(result.TextTestResult):
     # NOTE(vish, tfukushima): copied from unittest with edit to add color
     def addFailure(self, test, err):
         unittest.TestResult.addFailure(self, test, err)
-        self._handleElapsedTime(test)
+        self._handleElapsedTime(test, failed=True)
         self._writeResult(test, 'FAIL', 'red', 'F', False)
 
     # NOTE(vish, tfukushima): copied from unittest with edit to add color
@@ -201,9 +213,12 @@ class KongTestResult(result.TextTestResult):
         If the exception is a registered class, the error will be added
         to the list for that class, not errors.
         """
-        self._handleElapsedTime(test)
         stream = getattr(self, 'stream', None)
         ec, ev, tb = err
+        # skips and other registered error classes did not really run
+        skipped = any(result.isclass(ec) and issubclass(ec, cls)
+                      for cls in self.errorClasses)
+        self._handleElapsedTime(test, failed=True, skipped=skipped)
         try:
             exc_info = self._exc_info_to_string(err, test)
         except TypeError:
@@ -248,6 +263,7 @@ class KongTestResult(result.TextTestResult):
 class KongTestRunner(core.TextTestRunner):
     def __init__(self, *args, **kwargs):
         self.show_elapsed = kwargs.pop('show_elapsed')
+        self.durations_file = kwargs.pop('durations_file', None)
         core.TextTestRunner.__init__(self, *args, **kwargs)
 
     def _makeResult(self):
@@ -255,7 +271,8 @@ class KongTestRunner(core.TextTestRunner):
                               self.descriptions,
                               self.verbosity,
                               self.config,
-                              show_elapsed=self.show_elapsed)
+                              show_elapsed=self.show_elapsed,
+                              durations_file=self.durations_file)
 
     def _writeSlowTests(self, result_):
         # Pare out 'fast' tests
@@ -273,17 +290,23 @@ class KongTestRunner(core.TextTestRunner):
         result_ = core.TextTestRunner.run(self, test)
         if self.show_elapsed:
             self._writeSlowTests(result_)
+        if result_.durations is not None:
+            result_.durations.save()
         return result_
 
 
 if __name__ == '__main__':
     show_elapsed = True
+    durations_file = None
     argv = []
     for x in sys.argv:
         if x.startswith('test_'):
             argv.append('nova.tests.%s' % x)
         elif x.startswith('--hide-elapsed'):
             show_elapsed = False
+        elif x.startswith('--durations-file='):
+            # history of test durations, see tempest.common.durations
+            durations_file = x.split('=', 1)[1]
         else:
             argv.append(x)
 
@@ -295,5 +318,6 @@ if __name__ == '__main__':
     runner = KongTestRunner(stream=c.stream,
                             verbosity=c.verbosity,
                             config=c,
-                            show_elapsed=show_elapsed)
+                            show_elapsed=show_elapsed,
+                            durations_file=durations_file)
     sys.exit(not core.run(config=c, testRunner=runner, argv=argv))
@@ -6,6 +6,7 @@ function usage {
   echo ""
   echo "  -s, --smoke              Only run smoke tests"
   echo "  -p, --pep8               Just run pep8"
+  echo "  --parallel=N             Run the test classes in N processes"
   echo "  -h, --help               Print this usage message"
   echo "  -d. --debug              Debug this script -- set -o xtrace"
   exit
@@ -17,12 +18,14 @@ function process_option {
     -d|--debug) set -o xtrace;;
     -p|--pep8) let just_pep8=1;;
     -s|--smoke) noseargs="$noseargs --attr=type=smoke";;
+    --parallel=*) parallel=${1#*=};;
     *) noseargs="$noseargs $1"
   esac
 }
 
 noseargs="tempest"
 just_pep8=0
+parallel=0
 
 export NOSE_WITH_OPENSTACK=1
 export NOSE_OPENSTACK_COLOR=1
@@ -48,6 +51,9 @@ function run_pep8 {
 }
 
 NOSETESTS="nosetests $noseargs"
+if [ $parallel -gt 0 ]; then
+  NOSETESTS="python -m tempest.common.parallel -j $parallel $noseargs"
+fi
 
 if [ $just_pep8 -eq 1 ]; then
     run_pep8
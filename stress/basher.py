@@ -24,7 +24,8 @@ class BasherAction(object):
         `test_case`  : the name of the class that implements the action
         `pargs`      : positional arguments to the constructor of `test_case`
         `kargs`      : keyword arguments to the constructor of `test_case`
-        `probability`: frequency that each action
+        `probability`: weight of the action relative to the others,
+                       any non-negative number, e.g. a percentage
         """
         self.test_case = test_case
         self.pargs = pargs
@@ -18,6 +18,8 @@ to the bash_openstack function call"""
 
 import random
 import datetime
+import Queue
+import threading
 import time
 
 
@@ -25,7 +27,11 @@ import time
 from test_case import *
 import utils.util
 from config import StressConfig
+from pending_action import retry_all
+from sampler import AliasSampler
 from state import ClusterState, KeyPairState, FloatingIpState, VolumeState
+from tempest.common import telemetry
+from tempest.common.futures import WorkerPool
 from tempest.common.utils.data_utils import rand_name
 
 
@@ -49,20 +55,36 @@ _console.setFormatter(_formatter)
 logging.getLogger('').addHandler(_console)
 
 
-def _create_cases(choice_spec):
+def _create_sampler(choice_spec):
     """
-    Generate a workload of tests from workload description
+    Returns an AliasSampler of the actions of a workload description,
+    weighted by their `probability`
     """
-    cases = []
-    count = 0
-    for choice in choice_spec:
-        p = choice.probability
-        for i in range(p):
-            cases.append(choice)
-        i = i + p
-        count = count + p
-    assert(count == 100)
-    return cases
+    return AliasSampler(choice_spec,
+                        [choice.probability for choice in choice_spec])
+
+
+def _schedule_phases(sampler, phases):
+    """
+    Starts and returns timers changing the weights of `sampler` to those
+    of each (delay, weights) pair of `phases`, `delay` after now
+    """
+    timers = []
+    for delay, weights in phases:
+        # raises now if the weights are wrong, rather than in the timer
+        AliasSampler(sampler.items, weights)
+        timer = threading.Timer(_seconds(delay), sampler.set_weights,
+                                [weights])
+        timer.daemon = True
+        timer.start()
+        timers.append(timer)
+    return timers
+
+
+def _seconds(delay):
+    if isinstance(delay, datetime.timedelta):
+        return delay.days * 86400 + delay.seconds + delay.microseconds / 1e6
+    return float(delay)
 
 
 def _get_compute_nodes(keypath, user, controller):
@@ -98,18 +120,208 @@ def _error_in_logs(keypath, logdir, user, nodes):
     return False
 
 
+class ActionWorkers(object):
+    """
+    Threads that each invoke random actions of the workload until the end
+    of the test, sleeping `sleep_time` between their own actions, and put
+    the pending verifications the actions return in a queue.
+    """
+
+    def __init__(self, manager, state, sampler, count, sleep_time,
+                 end_time):
+        self.pending = Queue.Queue()
+        self.actions = 0
+        self._manager = manager
+        self._state = state
+        self._sampler = sampler
+        self._sleep_time = sleep_time
+        self._end_time = end_time
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._pool = WorkerPool(count)
+        self._futures = []
+        self._start(count)
+
+    def _start(self, count):
+        self._futures.extend(self._pool.submit(self._work)
+                             for _ in xrange(count))
+
+    def _work(self):
+        while not self._stopped and time.time() < self._end_time:
+            case = self._sampler.sample()
+            logging.debug('Chose %s' % case)
+            retry = case.invoke(self._manager, self._state)
+            if retry != None:
+                self.pending.put(retry)
+            with self._lock:
+                self.actions += 1
+            time.sleep(self._sleep_time)
+
+    def done(self):
+        """
+        Returns True once every worker is done, raising the exception of
+        the first one that failed
+        """
+        finished = []
+        with self._lock:
+            running = []
+            for future in self._futures:
+                (finished if future.done() else running).append(future)
+            self._futures = running
+        for future in finished:
+            future.result()
+        return not running
+
+    def take_pending(self):
+        """Returns the verifications queued since the last call"""
+        pending = []
+        while True:
+            try:
+                pending.append(self.pending.get_nowait())
+            except Queue.Empty:
+                return pending
+
+    def stop(self):
+        """Stops the workers after their current action"""
+        self._stopped = True
+        self._pool.shutdown()
+
+
+class OpenLoopActions(ActionWorkers):
+    """
+    Starts random actions of the workload at `rate` per second until the
+    end of the test, whether or not the previous ones have returned, so
+    that a slower cluster is offered the same load. The arrivals are
+    evenly spaced, or with `arrivals` = 'poisson' exponentially
+    distributed. Up to `count` actions run at once; later ones wait for a
+    free worker.
+
+    The latency of an action is counted from the time it was scheduled to
+    start, not from the time a worker got to it, so that a backlog shows
+    up in the latencies instead of hiding as fewer actions.
+    """
+
+    def __init__(self, manager, state, sampler, count, end_time, rate,
+                 arrivals='fixed'):
+        if arrivals not in ('fixed', 'poisson'):
+            raise ValueError("arrivals must be 'fixed' or 'poisson', not %r"
+                             % arrivals)
+        self.rate = float(rate)
+        if self.rate <= 0:
+            raise ValueError('rate must be positive, not %r' % rate)
+        self.arrivals = arrivals
+        self.latencies = {}
+        self._scheduler = None
+        self._wakeup = threading.Event()
+        super(OpenLoopActions, self).__init__(manager, state, sampler, count,
+                                              0, end_time)
+
+    def _start(self, count):
+        self._scheduler = threading.Thread(target=self._schedule)
+        self._scheduler.daemon = True
+        self._scheduler.start()
+
+    def _interval(self):
+        if self.arrivals == 'poisson':
+            return random.expovariate(self.rate)
+        return 1 / self.rate
+
+    def _schedule(self):
+        intended = time.time()
+        while not self._stopped:
+            intended += self._interval()
+            if intended >= self._end_time:
+                return
+            delay = intended - time.time()
+            if delay > 0:
+                self._wakeup.wait(delay)
+                if self._stopped:
+                    return
+            case = self._sampler.sample()
+            logging.debug('Chose %s' % case)
+            future = self._pool.submit(self._invoke, case, intended)
+            with self._lock:
+                self._futures.append(future)
+
+    def _invoke(self, case, intended):
+        if self._stopped:
+            return
+        retry = case.invoke(self._manager, self._state)
+        latency = time.time() - intended
+        if retry != None:
+            self.pending.put(retry)
+        with self._lock:
+            self.actions += 1
+            self.latencies.setdefault(str(case), []).append(latency)
+
+    def done(self):
+        scheduling = self._scheduler.is_alive()
+        return super(OpenLoopActions, self).done() and not scheduling
+
+    def stop(self):
+        """
+        Stops scheduling actions, then stops the workers after their
+        current action
+        """
+        self._stopped = True
+        self._wakeup.set()
+        self._scheduler.join()
+        super(OpenLoopActions, self).stop()
+
+    def log_latencies(self, elapsed):
+        """Logs the achieved rate and latency percentiles of each action"""
+        logging.info('%d actions in %.1f secs (%.2f/sec, target %.2f/sec)' %
+                     (self.actions, elapsed, self.actions / elapsed,
+                      self.rate))
+        for name, latencies in sorted(self.latencies.items()):
+            logging.info('%s: %d actions, latency p50 %.3f p95 %.3f '
+                         'p99 %.3f max %.3f secs' %
+                         ((name, len(latencies)) +
+                          tuple(telemetry.percentile(latencies, percent)
+                                for percent in (50, 95, 99, 100))))
+
+
+def _bash_concurrently(pool, check_logs):
+    """
+    Verifies the pending actions of the ActionWorkers `pool` every 5
+    seconds and the logs after every 100 actions, until all the actions
+    are verified. Returns False if errors were logged.
+    """
+    retry_list = []
+    logcheck_actions = 0
+    cooldown = False
+    try:
+        while True:
+            if not cooldown and pool.done():
+                logging.info('Cooling down...')
+                cooldown = True
+            retry_list.extend(pool.take_pending())
+            if cooldown and len(retry_list) == 0:
+                return not check_logs()
+            logging.debug('retry verifications for %d tasks', len(retry_list))
+            retry_list = retry_all(retry_list)
+            if pool.actions - logcheck_actions > 100:
+                if check_logs():
+                    return False
+                logcheck_actions = pool.actions
+            time.sleep(5)
+    finally:
+        pool.stop()
+
+
 def create_initial_vms(manager, state, count):
     image = manager.config.compute.image_ref
     flavor = manager.config.compute.flavor_ref
-    servers = []
     logging.info('Creating %d vms' % count)
-    for _ in xrange(count):
-        name = rand_name('initial_vm-')
-        _, server = manager.servers_client.create_server(name, image, flavor)
-        servers.append(server)
+    specs = [{'name': rand_name('initial_vm-'), 'image_ref': image,
+              'flavor_ref': flavor} for _ in xrange(count)]
+    futures = manager.servers_client.create_servers(specs)
+    servers = [future.result()[1] for future in futures]
+    manager.servers_client.wait_for_servers_status(
+        [server['id'] for server in servers], 'ACTIVE')
     for server in servers:
-        manager.servers_client.wait_for_server_status(server['id'], 'ACTIVE')
-        logging.info('Server Name: %s Id: %s' % (name, server['id']))
+        logging.info('Server Name: %s Id: %s' % (server['name'],
+                                                 server['id']))
         state.set_instance_state(server['id'], (server, 'ACTIVE'))
 
 
@@ -162,6 +374,27 @@ def bash_openstack(manager,
                     `max_vms`    = maximum number of instances to launch
                                    (default: 32)
                     `seed`       = random seed (default: None)
+                    `workers`    = number of actions in flight at once
+                                   (default: 1). With more than one
+                                   worker, each sleeps `sleep_time`
+                                   between its own actions and the pending
+                                   verifications are retried every 5 secs
+                                   by the calling thread. Runs are then not
+                                   reproducible from `seed`.
+                    `rate`       = start actions at this many per second
+                                   whatever the cluster's response time
+                                   (default: None, start each action
+                                   `sleep_time` after the previous one
+                                   returned). Up to `workers` actions run
+                                   at once (default: 32 with a rate).
+                    `arrivals`   = 'fixed' or 'poisson' spacing of the
+                                   actions started at `rate`
+                                   (default: fixed)
+                    `phases`     = list of (delay, weights) pairs, each
+                                   replacing the weights of the actions
+                                   of `choice_spec`, in order, `delay`
+                                   (secs or timedelta) after the start
+                                   (default: none)
     """
     stress_config = StressConfig(manager.config._conf)
     # get keyword arguments
@@ -170,6 +403,8 @@ def bash_openstack(manager,
     sleep_time = float(kwargs.get('sleep_time', 3000)) / 1000
     max_vms = int(kwargs.get('max_vms', stress_config.max_instances))
     test_name = kwargs.get('test_name', 'unamed test')
+    rate = kwargs.get('rate', None)
+    workers = int(kwargs.get('workers', 32 if rate else 1))
 
     keypath = stress_config.host_private_key_path
     user = stress_config.host_admin_user
@@ -178,7 +413,7 @@ def bash_openstack(manager,
     utils.util.execute_on_all(keypath, user, computes,
                               "rm -f %s/*.log" % logdir)
     random.seed(seed)
-    cases = _create_cases(choice_spec)
+    sampler = _create_sampler(choice_spec)
     state = ClusterState(max_vms=max_vms)
     create_initial_keypairs(manager, state,
                              int(kwargs.get('initial_keypairs', 0)))
@@ -200,41 +435,53 @@ def bash_openstack(manager,
     for kw in kwargs:
         logging.debug('\t%s = %s', kw, kwargs[kw])
 
-    while True:
-        if not cooldown:
-            if time.time() < test_end_time:
-                case = random.choice(cases)
-                logging.debug('Chose %s' % case)
-                retry = case.invoke(manager, state)
-                if retry != None:
-                    retry_list.append(retry)
-            else:
-                logging.info('Cooling down...')
-                cooldown = True
-        if cooldown and len(retry_list) == 0:
-            if _error_in_logs(keypath, logdir, user, computes):
-                test_succeeded = False
-            break
-        # Retry verifications every 5 seconds.
-        if time.time() - last_retry > 5:
-            logging.debug('retry verifications for %d tasks', len(retry_list))
-            new_retry_list = []
-            for v in retry_list:
-                v.check_timeout()
-                if not v.retry():
-                    new_retry_list.append(v)
-            retry_list = new_retry_list
-            last_retry = time.time()
-        time.sleep(sleep_time)
-        # Check error logs after 100 actions
-        if logcheck_count > 100:
-            if _error_in_logs(keypath, logdir, user, computes):
-                test_succeeded = False
+    phase_timers = _schedule_phases(sampler, kwargs.get('phases', []))
+    check_logs = lambda: _error_in_logs(keypath, logdir, user, computes)
+    if rate:
+        test_start_time = time.time()
+        pool = OpenLoopActions(manager, state, sampler, workers,
+                               test_end_time, rate,
+                               kwargs.get('arrivals', 'fixed'))
+        test_succeeded = _bash_concurrently(pool, check_logs)
+        pool.log_latencies(min(time.time(), test_end_time) - test_start_time)
+    elif workers > 1:
+        pool = ActionWorkers(manager, state, sampler, workers, sleep_time,
+                             test_end_time)
+        test_succeeded = _bash_concurrently(pool, check_logs)
+    else:
+        while True:
+            if not cooldown:
+                if time.time() < test_end_time:
+                    case = sampler.sample()
+                    logging.debug('Chose %s' % case)
+                    retry = case.invoke(manager, state)
+                    if retry != None:
+                        retry_list.append(retry)
+                else:
+                    logging.info('Cooling down...')
+                    cooldown = True
+            if cooldown and len(retry_list) == 0:
+                if _error_in_logs(keypath, logdir, user, computes):
+                    test_succeeded = False
                 break
+            # Retry verifications every 5 seconds.
+            if time.time() - last_retry > 5:
+                logging.debug('retry verifications for %d tasks',
+                              len(retry_list))
+                retry_list = retry_all(retry_list)
+                last_retry = time.time()
+            time.sleep(sleep_time)
+            # Check error logs after 100 actions
+            if logcheck_count > 100:
+                if _error_in_logs(keypath, logdir, user, computes):
+                    test_succeeded = False
+                    break
+                else:
+                    logcheck_count = 0
             else:
-                logcheck_count = 0
-        else:
-            logcheck_count = logcheck_count + 1
+                logcheck_count = logcheck_count + 1
+    for timer in phase_timers:
+        timer.cancel()
     # Cleanup
     logging.info('Cleaning up: terminating virtual machines...')
     vms = state.get_instances()
@@ -17,6 +17,7 @@ that nova API calls such as create/delete are completed"""
 
 import logging
 import time
+from tempest.common import telemetry
 from tempest.exceptions import TimeoutException
 
 
@@ -74,18 +75,79 @@ class PendingServerAction(PendingAction):
                                                   timeout=timeout)
         self._state = state
         self._target = target_server
+        self._observer = None
+        self._listed = None
+
+    def set_listed_server(self, server):
+        """
+        Hands over the details of the target server from the listing of
+        the current verification sweep, or None if it was not listed
+        """
+        self._listed = server
+
+    def _get_server(self):
+        """
+        Returns the details of the target server from the listing of the
+        current sweep, or from a GET if it was not listed
+        """
+        server = self._listed
+        self._listed = None
+        if server is None:
+            _resp, server = self._manager.servers_client.get_server(
+                self._target['id'])
+        return server
 
     def _check_for_status(self, state_string):
         """Check to see if the machine has transitioned states"""
         t = time.time()  # for debugging
         target = self._target
-        _resp, body = self._manager.servers_client.get_server(target['id'])
+        body = self._get_server()
+        if self._observer is None:
+            self._observer = telemetry.get_observer(self._manager.config,
+                                                    'server', body)
+        self._observer.observe(body['status'])
         if body['status'] != state_string:
             # grab the actual state as we think it is
-            temp_obj = self._state.get_instances()[target['id']]
+            temp_obj = self._state.get_instance_state(target['id'])
             self._logger.debug("machine %s in state %s" %
                                (target['id'], temp_obj[1]))
             self._logger.debug('%s, time: %d' % (temp_obj[1], time.time() - t))
             return temp_obj[1]
         self._logger.debug('%s, time: %d' % (state_string, time.time() - t))
         return state_string
+
+
+def retry_all(pending):
+    """
+    Runs one verification sweep: checks the timeout of the `pending`
+    actions and retries them, returning those not verified yet.
+
+    Rather than each PendingServerAction getting its own server, the
+    servers of every client are listed once, through the client's
+    ServerStateTracker, and each action is handed its row. Actions whose
+    server is not in the listing, e.g. because it was deleted, GET it.
+    """
+    trackers = {}
+    for action in pending:
+        if isinstance(action, PendingServerAction):
+            client = action._manager.servers_client
+            trackers[id(client)] = client.state_tracker
+    for tracker in trackers.values():
+        try:
+            tracker.refresh()
+        except Exception:
+            logging.exception('Failed to list servers, getting them one by '
+                              'one')
+            trackers = {}
+            break
+
+    remaining = []
+    for action in pending:
+        if isinstance(action, PendingServerAction):
+            tracker = trackers.get(id(action._manager.servers_client))
+            action.set_listed_server(tracker and
+                                     tracker.get(action._target['id']))
+        action.check_timeout()
+        if not action.retry():
+            remaining.append(action)
+    return remaining
@@ -0,0 +1,89 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Weighted random choice of the actions of a workload.
+
+Uses Vose's alias method: every draw takes two random numbers and two
+table lookups, however many actions there are and whatever their weights.
+"""
+
+import random
+
+
+def _alias_table(weights):
+    """
+    Returns the (probability, alias) lists of the alias table of
+    `weights`, which must not be negative and must not all be 0
+    """
+    count = len(weights)
+    total = float(sum(weights))
+    if not count or total <= 0 or min(weights) < 0:
+        raise ValueError("weights must not be negative and must not all be "
+                         "0: %r" % (weights,))
+    scaled = [weight * count / total for weight in weights]
+    small = [i for i, p in enumerate(scaled) if p < 1]
+    large = [i for i, p in enumerate(scaled) if p >= 1]
+    probability = [1.0] * count
+    alias = range(count)
+    while small and large:
+        less = small.pop()
+        more = large.pop()
+        probability[less] = scaled[less]
+        alias[less] = more
+        scaled[more] = (scaled[more] + scaled[less]) - 1
+        if scaled[more] < 1:
+            small.append(more)
+        else:
+            large.append(more)
+    # what remains is 1 up to rounding errors
+    return probability, alias
+
+
+class AliasSampler(object):
+    """Draws items at random in proportion to their weights"""
+
+    def __init__(self, items, weights, rng=random):
+        """
+        `items`   : the items to draw, e.g. BasherActions
+        `weights` : weight of each item, any non-negative number
+        `rng`     : source of random numbers, by default the `random`
+                    module, so that `random.seed` makes draws reproducible
+        """
+        self.items = list(items)
+        self.rng = rng
+        self.set_weights(weights)
+
+    def set_weights(self, weights):
+        """
+        Replaces the weights of the items. Safe to call while other
+        threads are drawing.
+        """
+        weights = list(weights)
+        if len(weights) != len(self.items):
+            raise ValueError("%d weights given for %d items" %
+                             (len(weights), len(self.items)))
+        # one assignment, so that draws never see half a table
+        self._table = _alias_table(weights)
+        self.weights = weights
+
+    def sample(self):
+        """Returns an item drawn at random"""
+        probability, alias = self._table
+        i = int(self.rng.random() * len(probability))
+        if self.rng.random() < probability[i]:
+            return self.items[i]
+        return self.items[alias[i]]
@@ -12,80 +12,274 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import random
+import threading
+
+
+class _Bucket(object):
+    """Set with constant-time add, remove and random choice"""
+
+    __slots__ = ('_items', '_positions')
+
+    def __init__(self):
+        self._items = []
+        self._positions = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def add(self, item):
+        if item not in self._positions:
+            self._positions[item] = len(self._items)
+            self._items.append(item)
+
+    def remove(self, item):
+        """Removes `item`, moving the last item to its place"""
+        position = self._positions.pop(item)
+        last = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._positions[last] = position
+
+    def choice(self):
+        return self._items[random.randrange(len(self._items))]
+
+
+class InstanceState(object):
+    """What we believe the state of an instance is"""
+
+    __slots__ = ('server', 'status')
+
+    def __init__(self, server, status):
+        self.server = server
+        self.status = status
+
 
 class ClusterState(object):
     """A class to store the state of various persistent objects in the Nova
     cluster, e.g. instances, volumes.  Use methods to query to state which than
-    can be compared to the current state of the objects in Nova"""
+    can be compared to the current state of the objects in Nova.
+
+    The instances are indexed by id and bucketed by status, and the other
+    objects kept in sets, so that looking up, changing or picking one at
+    random takes constant time however many there are. The state is
+    shared by the workers of a concurrent workload, so every method holds
+    a lock and the getters return copies."""
 
     def __init__(self, **kwargs):
         self._max_vms = kwargs.get('max_vms', 32)
         self._instances = {}
-        self._floating_ips = []
-        self._keypairs = []
-        self._volumes = []
+        # instances being created, and how many were ever reserved
+        self._reserved = 0
+        self._reservations = 0
+        self._statuses = {}
+        self._floating_ips = _Bucket()
+        self._keypairs = _Bucket()
+        self._volumes = _Bucket()
+        self._lock = threading.RLock()
 
     # instance state methods
     def get_instances(self):
         """return the instances dictionary that we believe are in cluster."""
-        return self._instances
+        with self._lock:
+            return dict((key, (record.server, record.status))
+                        for key, record in self._instances.iteritems())
+
+    def get_instance_state(self, key):
+        """return the (server, status) pair indexed at `key`, or None."""
+        with self._lock:
+            record = self._instances.get(key)
+            if record is None:
+                return None
+            return record.server, record.status
+
+    def count_instances(self, status=None):
+        """return the number of instances, or of those in `status`."""
+        with self._lock:
+            if status is None:
+                return len(self._instances)
+            return len(self._statuses.get(status, ()))
 
     def get_max_instances(self):
         """return the maximum number of instances we can create."""
         return self._max_vms
 
+    def reserve_instance(self):
+        """Reserve room for an instance about to be created, so that the
+        workers together never create more than the maximum number of
+        instances. Returns a number unique to the reservation, e.g. to
+        name the instance, or None if there is no room left. Every
+        reservation must be ended with release_instance(), once the
+        instance is stored or its creation failed."""
+        with self._lock:
+            if len(self._instances) + self._reserved >= self._max_vms:
+                return None
+            self._reserved += 1
+            self._reservations += 1
+            return self._reservations - 1
+
+    def release_instance(self):
+        """End a reservation made with reserve_instance()."""
+        with self._lock:
+            self._reserved -= 1
+
+    def _bucket_instance(self, key, status):
+        bucket = self._statuses.get(status)
+        if bucket is None:
+            bucket = self._statuses[status] = _Bucket()
+        bucket.add(key)
+
+    def _unbucket_instance(self, key, status):
+        bucket = self._statuses[status]
+        bucket.remove(key)
+        if not bucket:
+            del self._statuses[status]
+
     def set_instance_state(self, key, val):
-        """Store `val` in the dictionary indexed at `key`."""
-        self._instances[key] = val
+        """Store `val`, a (server, status) pair, indexed at `key`."""
+        server, status = val
+        with self._lock:
+            record = self._instances.get(key)
+            if record is None:
+                self._instances[key] = InstanceState(server, status)
+                self._bucket_instance(key, status)
+                return
+            if record.status != status:
+                self._unbucket_instance(key, record.status)
+                self._bucket_instance(key, status)
+            record.server = server
+            record.status = status
 
     def delete_instance_state(self, key):
         """Delete state indexed at `key`."""
-        del self._instances[key]
+        with self._lock:
+            record = self._instances.pop(key)
+            self._unbucket_instance(key, record.status)
+
+    def _choose_instance(self, statuses):
+        if statuses:
+            buckets = [self._statuses[status] for status in statuses
+                       if status in self._statuses]
+        else:
+            buckets = [bucket for status, bucket in self._statuses.items()
+                       if status not in (None, 'TERMINATING')]
+        total = sum(len(bucket) for bucket in buckets)
+        if not total:
+            return None
+        # pick a bucket in proportion to its size, then an instance of it
+        position = random.randrange(total)
+        for bucket in buckets:
+            if position < len(bucket):
+                return bucket.choice()
+            position -= len(bucket)
+
+    def random_instance(self, statuses=None):
+        """Return the (server, status) pair of a random instance whose
+        status is in `statuses`, or of any instance not TERMINATING if
+        `statuses` is None, or None if there is no such instance."""
+        with self._lock:
+            key = self._choose_instance(statuses)
+            if key is None:
+                return None
+            record = self._instances[key]
+            return record.server, record.status
+
+    def claim_instance(self, statuses, new_status):
+        """Pick a random instance like random_instance() and set its status
+        to `new_status` so that no other worker picks it. Returns the
+        (server, previous status) pair, or None if there is no such
+        instance."""
+        with self._lock:
+            target = self.random_instance(statuses)
+            if target is not None:
+                self.set_instance_state(target[0]['id'],
+                                        (target[0], new_status))
+            return target
 
     #floating_ip state methods
     def get_floating_ips(self):
         """return the floating ips list for the cluster."""
-        return self._floating_ips
+        with self._lock:
+            return list(self._floating_ips)
+
+    def random_floating_ip(self):
+        """return a random floating ip, or None if there are none."""
+        with self._lock:
+            return self._floating_ips.choice() if self._floating_ips else None
+
+    def claim_floating_ip(self):
+        """Pick a random floating ip and mark it change_pending so that no
+        other worker changes it too. Returns None if there are none or the
+        one picked already has a change pending."""
+        with self._lock:
+            floating_ip = self.random_floating_ip()
+            if floating_ip is None or floating_ip.change_pending:
+                return None
+            floating_ip.change_pending = True
+            return floating_ip
 
     def add_floating_ip(self, floating_ip_state):
         """Add floating ip."""
-        self._floating_ips.append(floating_ip_state)
+        with self._lock:
+            self._floating_ips.add(floating_ip_state)
 
     def remove_floating_ip(self, floating_ip_state):
         """Remove floating ip."""
-        self._floating_ips.remove(floating_ip_state)
+        with self._lock:
+            self._floating_ips.remove(floating_ip_state)
 
     # keypair methods
     def get_keypairs(self):
         """return the keypairs list for the cluster."""
-        return self._keypairs
+        with self._lock:
+            return list(self._keypairs)
+
+    def random_keypair(self):
+        """return a random keypair, or None if there are none."""
+        with self._lock:
+            return self._keypairs.choice() if self._keypairs else None
 
     def add_keypair(self, keypair_state):
         """Add keypair."""
-        self._keypairs.append(keypair_state)
+        with self._lock:
+            self._keypairs.add(keypair_state)
 
     def remove_keypair(self, keypair_state):
         """Remove keypair."""
-        self._keypairs.remove(keypair_state)
+        with self._lock:
+            self._keypairs.remove(keypair_state)
 
     # volume methods
     def get_volumes(self):
         """return the volumes list for the cluster."""
-        return self._volumes
+        with self._lock:
+            return list(self._volumes)
+
+    def random_volume(self):
+        """return a random volume, or None if there are none."""
+        with self._lock:
+            return self._volumes.choice() if self._volumes else None
 
     def add_volume(self, volume_state):
         """Add volume."""
-        self._volumes.append(volume_state)
+        with self._lock:
+            self._volumes.add(volume_state)
 
     def remove_volume(self, volume_state):
         """Remove volume."""
-        self._volumes.remove(volume_state)
+        with self._lock:
+            self._volumes.remove(volume_state)
 
 
 class ServerAssociatedState(object):
     """Class that tracks resources that are associated with a particular server
     such as a volume or floating ip"""
 
+    __slots__ = ('server_id', 'resource_id', 'change_pending')
+
     def __init__(self, resource_id):
         # The id of the server.
         self.server_id = None
@@ -97,6 +291,8 @@ class ServerAssociatedState(object):
 
 class FloatingIpState(ServerAssociatedState):
 
+    __slots__ = ('address',)
+
     def __init__(self, ip_desc):
         super(FloatingIpState, self).__init__(ip_desc['id'])
         self.address = ip_desc['ip']
@@ -104,12 +300,16 @@ class FloatingIpState(ServerAssociatedState):
 
 class VolumeState(ServerAssociatedState):
 
+    __slots__ = ()
+
     def __init__(self, volume_desc):
         super(VolumeState, self).__init__(volume_desc['id'])
 
 
 class KeyPairState(object):
 
+    __slots__ = ('name', 'private_key')
+
     def __init__(self, keypair_spec):
         self.name = keypair_spec['name']
         self.private_key = keypair_spec['private_key']
@@ -35,10 +35,9 @@ class TestChangeFloatingIp(test_case.StressTestCase):
         if self.server_ids == None:
             vms = state.get_instances()
             self.server_ids = [k for k, v in vms.iteritems()]
-        floating_ip = random.choice(state.get_floating_ips())
-        if floating_ip.change_pending:
+        floating_ip = state.claim_floating_ip()
+        if floating_ip is None:
             return None
-        floating_ip.change_pending = True
         timeout = int(kwargs.get('timeout', 60))
         if floating_ip.server_id == None:
             server = random.choice(self.server_ids)
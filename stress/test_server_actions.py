@@ -19,7 +19,6 @@ actions veriy that the API call was successful or not."""
 
 
 # system imports
-import random
 import time
 
 # local imports
@@ -45,17 +44,15 @@ class TestRebootVM(test_case.StressTestCase):
                        `type`    : reboot type [SOFT or HARD] (default is SOFT)
         """
 
-        vms = state.get_instances()
-        active_vms = [v for k, v in vms.iteritems() if v and v[1] == 'ACTIVE']
+        # select active vm to reboot and then send request to nova controller
+        target = state.random_instance(['ACTIVE'])
         # no active vms, so return null
-        if not active_vms:
+        if not target:
             self._logger.info('no ACTIVE instances to reboot')
             return
 
         _reboot_arg = kwargs.get('type', 'SOFT')
 
-        # select active vm to reboot and then send request to nova controller
-        target = random.choice(active_vms)
         reboot_target = target[0]
         # It seems that doing a reboot when in reboot is an error.
         try:
@@ -103,9 +100,8 @@ class VerifyRebootVM(pending_action.PendingServerAction):
         """
         # don't run reboot verification if target machine has been
         # deleted or is going to be deleted
-        if (self._target['id'] not in self._state.get_instances().keys() or
-            self._state.get_instances()[self._target['id']][1] ==
-            'TERMINATING'):
+        current = self._state.get_instance_state(self._target['id'])
+        if current is None or current[1] == 'TERMINATING':
             self._logger.debug('machine %s is deleted or TERMINATING' %
                                self._target['id'])
             return True
@@ -19,7 +19,6 @@ actions veriy that the API call was successful or not."""
 
 
 # system imports
-import random
 import time
 
 
@@ -30,7 +29,6 @@ import pending_action
 
 class TestCreateVM(test_case.StressTestCase):
     """Create a virtual machine in the Nova cluster."""
-    _vm_id = 0
 
     def run(self, manager, state, *pargs, **kwargs):
         """
@@ -50,11 +48,17 @@ class TestCreateVM(test_case.StressTestCase):
         """
 
         # restrict number of instances we can launch
-        if len(state.get_instances()) >= state.get_max_instances():
+        vm_id = state.reserve_instance()
+        if vm_id is None:
             self._logger.debug("maximum number of instances created: %d" %
                                state.get_max_instances())
             return None
+        try:
+            return self._create(manager, state, vm_id, **kwargs)
+        finally:
+            state.release_instance()
 
+    def _create(self, manager, state, vm_id, **kwargs):
         _key_name = kwargs.get('key_name', '')
         _timeout = int(kwargs.get('timeout',
                                   manager.config.compute.build_timeout))
@@ -63,7 +67,7 @@ class TestCreateVM(test_case.StressTestCase):
                                  manager.config.compute.flavor_ref)
 
         expected_server = {
-            'name': 'server' + str(TestCreateVM._vm_id),
+            'name': 'server' + str(vm_id),
             'metadata': {
                 'key1': 'value1',
                 'key2': 'value2',
@@ -73,7 +77,6 @@ class TestCreateVM(test_case.StressTestCase):
             'adminPass': 'testpwd',
             'key_name': _key_name
             }
-        TestCreateVM._vm_id = TestCreateVM._vm_id + 1
         response, body = manager.servers_client.create_server(
                                          expected_server['name'],
                                          _image_ref,
@@ -119,9 +122,8 @@ class VerifyCreateVM(pending_action.PendingServerAction):
         """
         # don't run create verification
         # if target machine has been deleted or is going to be deleted
-        if (self._target['id'] not in self._state.get_instances().keys() or
-            self._state.get_instances()[self._target['id']][1] ==
-            'TERMINATING'):
+        current = self._state.get_instance_state(self._target['id'])
+        if current is None or current[1] == 'TERMINATING':
             self._logger.info('machine %s is deleted or TERMINATING' %
                                self._target['id'])
             return True
@@ -158,23 +160,24 @@ class TestKillActiveVM(test_case.StressTestCase):
         `kwargs`     : keyword arguments, which include:
                        `timeout` : how long to wait before issuing Exception
         """
-        # check for active instances
-        vms = state.get_instances()
-        active_vms = [v for k, v in vms.iteritems() if v and v[1] == 'ACTIVE']
+        # pick an active instance, marking it TERMINATING right away so
+        # that no other worker picks it as well
+        target = state.claim_instance(['ACTIVE'], 'TERMINATING')
         # no active vms, so return null
-        if not active_vms:
+        if not target:
             self._logger.info('no ACTIVE instances to delete')
             return
 
         _timeout = kwargs.get('timeout', manager.config.compute.build_timeout)
 
-        target = random.choice(active_vms)
         killtarget = target[0]
-        manager.servers_client.delete_server(killtarget['id'])
+        try:
+            manager.servers_client.delete_server(killtarget['id'])
+        except Exception:
+            state.set_instance_state(killtarget['id'], target)
+            raise
         self._logger.info('machine %s: ACTIVE -> TERMINATING' %
                           killtarget['id'])
-        state.set_instance_state(killtarget['id'],
-                                (killtarget, 'TERMINATING'))
         return VerifyKillActiveVM(manager, state,
                                   killtarget, timeout=_timeout)
 
@@ -191,11 +194,11 @@ class VerifyKillActiveVM(pending_action.PendingServerAction):
         tid = self._target['id']
         # if target machine has been deleted from the state, then it was
         # already verified to be deleted
-        if (not tid in self._state.get_instances().keys()):
+        if self._state.get_instance_state(tid) is None:
             return False
 
         try:
-            self._manager.servers_client.get_server(tid)
+            self._get_server()
         except Exception:
             # if we get a 404 response, is the machine really gone?
             target = self._target
@@ -222,20 +225,20 @@ class TestKillAnyVM(test_case.StressTestCase):
                        `timeout` : how long to wait before issuing Exception
         """
 
-        vms = state.get_instances()
+        target = state.claim_instance(None, 'TERMINATING')
         # no vms, so return null
-        if not vms:
+        if not target:
             self._logger.info('no active instances to delete')
             return
 
         _timeout = kwargs.get('timeout', manager.config.compute.build_timeout)
 
-        target = random.choice(vms)
         killtarget = target[0]
-
-        manager.servers_client.delete_server(killtarget['id'])
-        self._state.set_instance_state(killtarget['id'],
-                                      (killtarget, 'TERMINATING'))
+        try:
+            manager.servers_client.delete_server(killtarget['id'])
+        except Exception:
+            state.set_instance_state(killtarget['id'], target)
+            raise
         # verify object will do the same thing as the active VM
         return VerifyKillAnyVM(manager, state, killtarget, timeout=_timeout)
 
@@ -257,23 +260,25 @@ class TestUpdateVMName(test_case.StressTestCase):
         """
 
         # select one machine from active ones
-        vms = state.get_instances()
-        active_vms = [v for k, v in vms.iteritems() if v and v[1] == 'ACTIVE']
+        target = state.claim_instance(['ACTIVE'], 'UPDATING_NAME')
         # no active vms, so return null
-        if not active_vms:
+        if not target:
             self._logger.info('no active instances to update')
             return
 
         _timeout = kwargs.get('timeout', manager.config.compute.build_timeout)
 
-        target = random.choice(active_vms)
         update_target = target[0]
 
         # Update name by appending '_updated' to the name
         new_name = update_target['name'] + '_updated'
-        (response, body) = \
-            manager.servers_client.update_server(update_target['id'],
-                                                    name=new_name)
+        try:
+            (response, body) = \
+                manager.servers_client.update_server(update_target['id'],
+                                                     name=new_name)
+        except Exception:
+            state.set_instance_state(update_target['id'], target)
+            raise
         if (response.status != 200):
             self._logger.error("response: %s " % response)
             self._logger.error("body: %s " % body)
@@ -300,18 +305,11 @@ class VerifyUpdateVMName(pending_action.PendingServerAction):
         """
         # don't run update verification
         # if target machine has been deleted or is going to be deleted
-        if (not self._target['id'] in self._state.get_instances().keys() or
-            self._state.get_instances()[self._target['id']][1] ==
-            'TERMINATING'):
+        current = self._state.get_instance_state(self._target['id'])
+        if current is None or current[1] == 'TERMINATING':
             return False
 
-        response, body = \
-            self._manager.serverse_client.get_server(self._target['id'])
-        if (response.status != 200):
-            self._logger.error("response: %s " % response)
-            self._logger.error("body: %s " % body)
-            raise Exception
-
+        body = self._get_server()
         if self._target['name'] != body['name']:
             self._logger.error(self._target['name'] +
                                ' vs. ' +
@@ -0,0 +1,52 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+class AsyncClient(object):
+
+    """
+    Non-blocking view of a service client.
+
+    Every public method of the wrapped client is available with the same
+    arguments, but calling it queues the call on a shared WorkerPool and
+    returns a Future instead of (resp, body). URL and body construction
+    as well as the mapping of error responses to NotFound, OverLimit,
+    ComputeFault, ... are those of the wrapped client, and any of those
+    exceptions is re-raised from Future.result().
+
+    Example::
+
+        pool = WorkerPool(50)
+        servers = AsyncClient(manager.servers_client, pool)
+        futures = [servers.get_server(id) for id in server_ids]
+        bodies = [f.result()[1] for f in futures]
+    """
+
+    def __init__(self, client, pool):
+        self.client = client
+        self.pool = pool
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        def submit(*args, **kwargs):
+            return self.pool.submit(attr, *args, **kwargs)
+        submit.__name__ = name
+        submit.__doc__ = attr.__doc__
+        return submit
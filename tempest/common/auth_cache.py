@@ -0,0 +1,114 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import calendar
+import threading
+import time
+
+
+# re-authenticate this many seconds before a token expires
+EXPIRY_MARGIN = 60
+
+
+def parse_expires(expires):
+    """
+    Converts a Keystone token expiry timestamp (e.g. 2012-05-01T12:00:00Z)
+    to seconds since the epoch. Returns None if it cannot be parsed.
+    """
+    try:
+        return calendar.timegm(time.strptime(expires[:19],
+                                             '%Y-%m-%dT%H:%M:%S'))
+    except (TypeError, ValueError):
+        return None
+
+
+class AuthData(object):
+
+    """Token and service catalog returned by a Keystone authentication"""
+
+    def __init__(self, token, expires, catalog, tenant_id):
+        self.token = token
+        self.expires = expires
+        self.catalog = catalog
+        self.tenant_id = tenant_id
+
+    def expires_within(self, seconds):
+        """Returns True if the token expires in less than `seconds`"""
+        if self.expires is None:
+            return False
+        return self.expires - time.time() < seconds
+
+
+class AuthCache(object):
+
+    """
+    Process-wide cache of tokens and service catalogs keyed by
+    (auth_url, user, tenant_name), so that all of the clients created for
+    one set of credentials authenticate once instead of once each.
+    """
+
+    def __init__(self, expiry_margin=EXPIRY_MARGIN):
+        self.expiry_margin = expiry_margin
+        self._data = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def _get_key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, key, authenticate):
+        """
+        Returns the cached AuthData for `key`. When there is none, or the
+        cached token is about to expire, `authenticate` is called to fetch
+        a new one. Concurrent callers for the same key wait for a single
+        authentication instead of each issuing their own.
+        """
+        with self._get_key_lock(key):
+            data = self._data.get(key)
+            if data is None or data.expires_within(self.expiry_margin):
+                data = authenticate()
+                if data is not None:
+                    self._data[key] = data
+            return data
+
+    def peek(self, key):
+        """Returns the cached AuthData for `key` without authenticating"""
+        return self._data.get(key)
+
+    def invalidate(self, key, token=None):
+        """
+        Drops the cached entry for `key`. If `token` is given, the entry is
+        only dropped while it still holds that token, so a token that was
+        already refreshed by another client is left alone.
+        """
+        with self._lock:
+            data = self._data.get(key)
+            if data is not None and (token is None or data.token == token):
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_cache = AuthCache()
+
+
+def get_cache():
+    """Returns the process-wide authentication cache"""
+    return _cache
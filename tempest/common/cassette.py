@@ -0,0 +1,202 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Record and replay of the HTTP traffic of the REST clients.
+
+In record mode every request sent through the shared transport is passed
+on to the connection pool and the response is appended to a cassette
+file, one JSON document per line. In replay mode the responses are read
+back from the cassette and no request leaves the process.
+
+A request is matched on its method, path, query string and a digest of
+its body, with the query parameters sorted and a JSON body re-encoded
+with sorted keys. Each of these keys has its own queue of recorded
+responses, which are replayed in the order they were recorded, e.g. to
+the successive polls of a waiter.
+
+Ids are read back from the recorded responses, so they are the same in
+replay. For generated names to be the same as well, the first line of
+the cassette holds a seed, chosen when recording, from which
+data_utils.rand_name derives its names in both modes.
+"""
+
+import base64
+import collections
+import hashlib
+import json
+import logging
+import random
+import threading
+import urllib
+import urlparse
+
+import httplib2
+
+from tempest import exceptions
+from tempest.common import connection_pool
+from tempest.common.utils import data_utils
+
+LOG = logging.getLogger(__name__)
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+
+def _body_digest(body):
+    if not body:
+        return None
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True,
+                          separators=(',', ':'))
+    except (TypeError, ValueError):
+        pass
+    if isinstance(body, unicode):
+        body = body.encode('utf-8')
+    return hashlib.sha1(body).hexdigest()
+
+
+def _request_key(method, uri, body):
+    parts = urlparse.urlsplit(uri)
+    url = parts.path
+    if parts.query:
+        params = urlparse.parse_qsl(parts.query, keep_blank_values=True)
+        url += '?' + urllib.urlencode(sorted(params))
+    return method, url, _body_digest(body)
+
+
+class Cassette(object):
+
+    """
+    Transport with the request interface of httplib2.Http that records
+    the responses of `transport` to, or replays them from, a file
+    """
+
+    def __init__(self, path, mode, transport=None):
+        """
+        :param path: Cassette file
+        :param mode: RECORD or REPLAY
+        :param transport: Transport used to send requests when recording
+        """
+        if mode not in (RECORD, REPLAY):
+            raise exceptions.InvalidConfiguration(
+                "Unknown cassette mode: %s" % mode)
+        if mode == RECORD and transport is None:
+            raise ValueError("A transport is required to record")
+        self.path = path
+        self.mode = mode
+        self.transport = transport
+        self._lock = threading.Lock()
+        self._file = None
+        self._responses = None
+        if mode == RECORD:
+            self.seed = random.getrandbits(32)
+        else:
+            self.seed, self._responses = self._load()
+
+    def _load(self):
+        seed = None
+        responses = collections.defaultdict(collections.deque)
+        with open(self.path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if 'seed' in entry:
+                    seed = entry['seed']
+                    continue
+                key = entry['method'], entry['url'], entry.get('request')
+                responses[key].append(entry)
+        return seed, responses
+
+    def _replay(self, method, uri, body):
+        key = _request_key(method, uri, body)
+        with self._lock:
+            queue = self._responses.get(key)
+            if not queue:
+                raise exceptions.CassetteMismatch(method=method, url=uri)
+            entry = queue.popleft()
+        body = entry['body']
+        if entry.get('b64'):
+            body = base64.b64decode(body)
+        elif body is not None:
+            body = body.encode('utf-8')
+        return httplib2.Response(entry['headers']), body
+
+    def _record(self, method, uri, body, resp, resp_body):
+        method, url, digest = _request_key(method, uri, body)
+        entry = {'method': method, 'url': url, 'request': digest,
+                 'headers': dict(resp)}
+        try:
+            entry['body'] = resp_body.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['body'] = base64.b64encode(resp_body)
+            entry['b64'] = True
+        except AttributeError:
+            entry['body'] = resp_body
+        line = json.dumps(entry, separators=(',', ':'))
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'w')
+                self._file.write(json.dumps({'seed': self.seed}) + '\n')
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        if self.mode == REPLAY:
+            return self._replay(method, uri, body)
+        resp, resp_body = self.transport.request(uri, method, body=body,
+                                                 headers=headers, **kwargs)
+        self._record(method, uri, body, resp, resp_body)
+        return resp, resp_body
+
+    def remaining(self):
+        """Returns the number of recorded responses not replayed yet"""
+        with self._lock:
+            if self.mode == RECORD:
+                return None
+            return sum(len(queue) for queue in self._responses.values())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_transport(config):
+    """
+    Returns the transport the REST clients send their requests through:
+    the shared connection pool, or a process-wide Cassette around it if
+    [http] cassette_mode is set, in which case generated names are
+    seeded from the cassette
+    """
+    global _cassette
+    pool = connection_pool.get_pool(config)
+    mode = config.http.cassette_mode
+    if not mode:
+        return pool
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(config.http.cassette_file, mode, pool)
+            data_utils.seed_names(_cassette.seed)
+            LOG.info("Cassette %s opened for %s" % (_cassette.path, mode))
+    return _cassette
@@ -0,0 +1,132 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import time
+import urlparse
+
+import httplib2
+
+
+class ConnectionPool(object):
+
+    """
+    Thread-safe pool of keep-alive HTTP connections.
+
+    httplib2.Http keeps its underlying connection open between requests,
+    but a single Http object must not be used by two threads at once.
+    The pool therefore hands out one Http object per in-flight request
+    and keeps up to `max_size` idle ones around per scheme/host/port so
+    that later requests to the same endpoint skip the TCP (and TLS)
+    connection setup.
+    """
+
+    def __init__(self, max_size=10, idle_timeout=60, timeout=None):
+        """
+        :param max_size: Maximum number of idle connections kept per host
+        :param idle_timeout: Seconds after which an idle connection is
+                             closed instead of being reused
+        :param timeout: Socket timeout of the connections, None for none
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _get_key(self, uri):
+        parts = urlparse.urlsplit(uri)
+        port = parts.port
+        if port is None:
+            port = 443 if parts.scheme == 'https' else 80
+        return parts.scheme, parts.hostname, port
+
+    def _close(self, http):
+        for conn in http.connections.values():
+            conn.close()
+        http.connections.clear()
+
+    def _evict_idle(self, idle, now):
+        """Closes connections at the cold end of an idle list"""
+        while idle and now - idle[0][0] >= self.idle_timeout:
+            last_used, http = idle.pop(0)
+            self._close(http)
+
+    def _acquire(self, key):
+        now = time.time()
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self._evict_idle(idle, now)
+                if idle:
+                    last_used, http = idle.pop()
+                    return http
+        return httplib2.Http(timeout=self.timeout)
+
+    def _release(self, key, http):
+        now = time.time()
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            self._evict_idle(idle, now)
+            if len(idle) < self.max_size:
+                idle.append((now, http))
+                return
+        self._close(http)
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        """
+        Issues a request with the same signature as httplib2.Http.request,
+        reusing an idle connection to the target host when one exists.
+        """
+        key = self._get_key(uri)
+        http = self._acquire(key)
+        try:
+            resp, resp_body = http.request(uri, method, body=body,
+                                           headers=headers, **kwargs)
+        except Exception:
+            # The connection is in an unknown state, never reuse it
+            self._close(http)
+            raise
+        self._release(key, http)
+        return resp, resp_body
+
+    def clear(self):
+        """Closes all idle connections held by the pool"""
+        with self._lock:
+            for idle in self._idle.values():
+                for last_used, http in idle:
+                    self._close(http)
+            self._idle.clear()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(config):
+    """
+    Returns the process-wide connection pool, creating it from the
+    [http] section of the configuration on first use. A pool_size of
+    zero disables connection reuse entirely.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(config.http.pool_size,
+                                   config.http.pool_idle_timeout,
+                                   config.http.timeout)
+    return _pool
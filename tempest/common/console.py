@@ -0,0 +1,94 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Following the console log of a server with os-getConsoleOutput.
+
+The API only returns the last `length` lines of the log, so new lines are
+found by overlapping each tail with the end of the previous one. The tail
+requested starts small and is doubled whenever it holds no line seen
+before, i.e. when more lines were written since the previous poll than it
+can hold.
+"""
+
+import logging
+
+LOG = logging.getLogger(__name__)
+
+INITIAL_LENGTH = 20
+MAX_LENGTH = 1280
+
+
+def _overlap(seen, lines):
+    """
+    Returns the length of the longest end of `seen` that `lines` starts
+    with
+    """
+    for count in xrange(min(len(seen), len(lines)), 0, -1):
+        if seen[-count] == lines[0] and seen[-count:] == lines[:count]:
+            return count
+    return 0
+
+
+class ConsoleTail(object):
+
+    """New console log lines of a server, one poll() at a time"""
+
+    def __init__(self, client, server_id, length=INITIAL_LENGTH,
+                 max_length=MAX_LENGTH):
+        """
+        :param client: ConsoleOutputsClient
+        :param server_id: Server whose log is followed
+        :param length: Number of lines asked for at first
+        :param max_length: Longest tail asked for before giving up on
+                           finding the previous lines in it
+        """
+        self.client = client
+        self.server_id = server_id
+        self.length = length
+        self.max_length = max_length
+        self.seen = []
+        # text after the last newline, e.g. a login prompt
+        self.partial = ''
+        self.requests = 0
+
+    def _fetch(self, length):
+        self.requests += 1
+        resp, output = self.client.get_console_output(self.server_id, length)
+        lines = (output or '').split('\n')
+        partial = lines.pop()
+        # a full tail may begin in the middle of the log
+        full = len(lines) + 1 >= length
+        return lines, partial, full
+
+    def poll(self):
+        """Returns the complete lines written since the previous poll"""
+        while True:
+            lines, partial, full = self._fetch(self.length)
+            count = _overlap(self.seen, lines)
+            if count or not self.seen or not full:
+                break
+            if self.length >= self.max_length:
+                LOG.debug("Lost track of the console log of server %s" %
+                          self.server_id)
+                break
+            self.length = min(self.length * 2, self.max_length)
+
+        new = lines[count:]
+        self.seen = (self.seen + new)[-self.max_length:]
+        self.partial = partial
+        return new
@@ -0,0 +1,255 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Pool of isolated tenant/user pairs shared by the test classes of a run.
+
+Instead of creating a tenant and user when a class starts and deleting
+them when it ends, the pool creates its pairs in parallel when first
+used and leases them to classes. A returned pair is swept of the
+servers, volumes, snapshots, floating IPs, keypairs and security groups
+left in its tenant before the next lease, and the pairs are deleted once
+when the process exits.
+"""
+
+import atexit
+import logging
+import threading
+
+from tempest import exceptions
+from tempest.common.futures import WorkerPool
+from tempest.common.utils.data_utils import rand_name
+
+LOG = logging.getLogger(__name__)
+
+PASSWORD = 'pass'
+
+
+class Credentials(object):
+
+    """A tenant and user of the pool"""
+
+    def __init__(self, user, tenant, password):
+        self.user = user
+        self.tenant = tenant
+        self.password = password
+
+    @property
+    def username(self):
+        return self.user['name']
+
+    @property
+    def tenant_name(self):
+        return self.tenant['name']
+
+
+class CredentialPool(object):
+
+    """Tenant/user pairs created up front and leased to test classes"""
+
+    def __init__(self, admin_client, manager_factory, size):
+        """
+        :param admin_client: Identity AdminClient the pairs are created
+                             and deleted with
+        :param manager_factory: Callable returning an openstack.Manager
+                                given username, password and tenant_name,
+                                used to sweep the tenants
+        :param size: Number of pairs created up front
+        """
+        self.admin_client = admin_client
+        self.manager_factory = manager_factory
+        self.size = size
+        self.created = 0
+        self.sweeps = 0
+        self._idle = []
+        self._leased = {}
+        self._workers = WorkerPool(max(1, size))
+        self._lock = threading.Lock()
+        self._provisioned = False
+
+    def _create(self):
+        name = rand_name('tempest-pool')
+        resp, tenant = self.admin_client.create_tenant(
+            name=name + '-tenant', description=name + '-tenant-desc')
+        try:
+            resp, user = self.admin_client.create_user(
+                name + '-user', PASSWORD, tenant['id'], name + '@example.com')
+        except Exception:
+            self.admin_client.delete_tenant(tenant['id'])
+            raise
+        with self._lock:
+            self.created += 1
+        return Credentials(user, tenant, PASSWORD)
+
+    def _delete(self, creds):
+        for delete, resource_id in ((self.admin_client.delete_user,
+                                     creds.user['id']),
+                                    (self.admin_client.delete_tenant,
+                                     creds.tenant['id'])):
+            try:
+                delete(resource_id)
+            except exceptions.NotFound:
+                pass
+            except Exception:
+                LOG.exception("Failed to delete pooled credentials %s" %
+                              creds.username)
+
+    def provision(self):
+        """
+        Creates the pool's pairs in parallel, once. If some of them fail,
+        those created are kept idle and the exception of the first failure
+        is raised; the next call creates the missing pairs.
+        """
+        with self._lock:
+            if self._provisioned:
+                return
+            self._provisioned = True
+            missing = self.size - len(self._idle) - len(self._leased)
+        futures = [self._workers.submit(self._create)
+                   for _ in xrange(missing)]
+        failed = None
+        for future in futures:
+            if future.exception() is None:
+                with self._lock:
+                    self._idle.append(future.result())
+            elif failed is None:
+                failed = future
+        if failed is not None:
+            with self._lock:
+                self._provisioned = False
+            failed.result()
+
+    def lease(self):
+        """
+        Returns idle Credentials for the exclusive use of the caller until
+        release(), creating a pair if all of them are leased
+        """
+        self.provision()
+        with self._lock:
+            creds = self._idle.pop() if self._idle else None
+        if creds is None:
+            creds = self._create()
+        with self._lock:
+            self._leased[creds.user['id']] = creds
+        return creds
+
+    def release(self, creds):
+        """
+        Sweeps the tenant of leased Credentials and makes them idle again,
+        or deletes them if the sweep fails
+        """
+        with self._lock:
+            self._leased.pop(creds.user['id'], None)
+        try:
+            self.sweep(creds)
+        except Exception:
+            LOG.exception("Failed to clean up tenant %s, replacing it" %
+                          creds.tenant_name)
+            self._delete(creds)
+            return
+        with self._lock:
+            self._idle.append(creds)
+
+    def sweep(self, creds):
+        """Deletes what the tests left in the tenant of `creds`"""
+        with self._lock:
+            self.sweeps += 1
+        os = self.manager_factory(username=creds.username,
+                                  password=creds.password,
+                                  tenant_name=creds.tenant_name)
+
+        servers_client = os.servers_client
+        resp, body = servers_client.list_servers()
+        server_ids = [server['id'] for server in body['servers']]
+        for server_id in server_ids:
+            _ignore_not_found(servers_client.delete_server, server_id)
+        for server_id in server_ids:
+            servers_client.wait_for_server_termination(server_id)
+
+        resp, floating_ips = os.floating_ips_client.list_floating_ips()
+        for floating_ip in floating_ips:
+            _ignore_not_found(os.floating_ips_client.delete_floating_ip,
+                              floating_ip['id'])
+
+        volumes_client = os.volumes_client
+        resp, volumes = volumes_client.list_volumes()
+        for volume in volumes:
+            _ignore_not_found(volumes_client.delete_volume, volume['id'])
+        for volume in volumes:
+            volumes_client.wait_for_resource_deletion(volume['id'])
+
+        resp, images = os.images_client.list_images({'type': 'snapshot'})
+        for image in images:
+            _ignore_not_found(os.images_client.delete_image, image['id'])
+
+        resp, keypairs = os.keypairs_client.list_keypairs()
+        for keypair in keypairs:
+            keypair = keypair.get('keypair', keypair)
+            _ignore_not_found(os.keypairs_client.delete_keypair,
+                              keypair['name'])
+
+        client = os.security_groups_client
+        resp, groups = client.list_security_groups()
+        for group in groups:
+            if group['name'] != 'default':
+                _ignore_not_found(client.delete_security_group, group['id'])
+
+    def close(self):
+        """Deletes every pair of the pool, idle or leased"""
+        with self._lock:
+            creds = self._idle + self._leased.values()
+            self._idle = []
+            self._leased = {}
+        for future in [self._workers.submit(self._delete, pair)
+                       for pair in creds]:
+            future.exception()
+        self._workers.shutdown()
+
+
+def _ignore_not_found(func, *args):
+    try:
+        func(*args)
+    except exceptions.NotFound:
+        pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _close():
+    if _pool is not None:
+        _pool.close()
+
+
+atexit.register(_close)
+
+
+def get_pool(config, admin_client_factory, manager_factory):
+    """
+    Returns the process-wide CredentialPool of [compute]
+    credential_pool_size pairs, or None if the option is 0
+    """
+    global _pool
+    size = config.compute.credential_pool_size
+    if not size:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = CredentialPool(admin_client_factory(), manager_factory,
+                                   size)
+        return _pool
@@ -0,0 +1,112 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Durations and failures of every test, kept across runs in a JSON file.
+
+Tests are identified by their unittest id, module.Class.method. The
+parallel runner uses the history to give the longest test classes out
+first and adds the tests it runs to it, as does the kong runner when
+given --durations-file.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_FILE = '.tempest-durations.json'
+
+# weight of the latest run in the smoothed duration of a test
+SMOOTHING = 0.5
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+class DurationHistory(object):
+
+    """Smoothed duration and time of last failure of each test"""
+
+    def __init__(self, path=DEFAULT_FILE):
+        """:param path: JSON file the history is read from and saved to"""
+        self.path = path
+        self.tests = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.tests = json.load(f)
+            except ValueError:
+                LOG.warning("Ignoring unreadable test durations in %s" % path)
+
+    def record(self, test_id, duration, failed=False, now=None):
+        """Adds a run of a test"""
+        if now is None:
+            now = time.time()
+        entry = self.tests.get(test_id)
+        if entry is None:
+            entry = self.tests[test_id] = {'duration': duration, 'runs': 0,
+                                           'last_failed': None}
+        else:
+            entry['duration'] += SMOOTHING * (duration - entry['duration'])
+        entry['runs'] += 1
+        entry['last_run'] = now
+        if failed:
+            entry['last_failed'] = now
+
+    def duration(self, test_id, default=None):
+        entry = self.tests.get(test_id)
+        return default if entry is None else entry['duration']
+
+    def last_failed(self, test_id):
+        entry = self.tests.get(test_id)
+        return None if entry is None else entry['last_failed']
+
+    def typical_duration(self):
+        """Returns the median duration of the known tests, or 1 second"""
+        if not self.tests:
+            return 1.0
+        return _median([entry['duration'] for entry in self.tests.values()])
+
+    def estimate(self, test_ids):
+        """
+        Returns the expected total duration of the tests, counting the
+        typical duration for tests never run before
+        """
+        default = self.typical_duration()
+        return sum(self.duration(test_id, default) for test_id in test_ids)
+
+    def latest_failure(self, test_ids):
+        """Returns when any of the tests last failed, 0 if never"""
+        return max([self.last_failed(test_id) or 0
+                    for test_id in test_ids] or [0])
+
+    def save(self):
+        """Writes the history, replacing the file atomically"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.tests, f, indent=1, sort_keys=True)
+        os.rename(temp_path, self.path)
@@ -0,0 +1,203 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+import Queue
+import sys
+import threading
+import time
+
+from tempest import exceptions
+
+LOG = logging.getLogger(__name__)
+
+
+class Future(object):
+
+    """
+    Result of an operation that completes in the background. Callers
+    block in result() until the value (or the exception raised by the
+    operation) is available.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._done = False
+        self._result = None
+        self._exc_info = None
+        self._callbacks = []
+
+    def done(self):
+        return self._done
+
+    def _complete(self, result, exc_info):
+        with self._condition:
+            if self._done:
+                return
+            self._result = result
+            self._exc_info = exc_info
+            self._done = True
+            self._condition.notify_all()
+            callbacks = self._callbacks
+            self._callbacks = []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception:
+                LOG.exception("Future callback %s failed" % callback)
+
+    def set_result(self, result):
+        self._complete(result, None)
+
+    def set_exception(self, exc_info=None):
+        """
+        Completes the future with an exception. `exc_info` is a
+        sys.exc_info() triple and defaults to the exception being handled,
+        so the original traceback is kept when result() re-raises it.
+        """
+        if exc_info is None:
+            exc_info = sys.exc_info()
+        self._complete(None, exc_info)
+
+    def _wait(self, timeout):
+        with self._condition:
+            if not self._done:
+                self._condition.wait(timeout)
+            if not self._done:
+                raise exceptions.TimeoutException()
+
+    def result(self, timeout=None):
+        """Waits for and returns the result, re-raising any exception"""
+        self._wait(timeout)
+        if self._exc_info is not None:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._result
+
+    def exception(self, timeout=None):
+        """Waits for completion and returns the exception raised, if any"""
+        self._wait(timeout)
+        if self._exc_info is not None:
+            return self._exc_info[1]
+        return None
+
+    def add_done_callback(self, callback):
+        """Calls callback(future) once done, immediately if already done"""
+        with self._condition:
+            if not self._done:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+
+def as_completed(futures, timeout=None):
+    """
+    Yields the futures in the order they complete. Raises
+    TimeoutException if they have not all completed within `timeout`
+    seconds.
+    """
+    futures = list(futures)
+    completed = Queue.Queue()
+    for future in futures:
+        future.add_done_callback(completed.put)
+    deadline = None if timeout is None else time.time() + timeout
+    for _ in futures:
+        remaining = None
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise exceptions.TimeoutException()
+        try:
+            yield completed.get(timeout=remaining)
+        except Queue.Empty:
+            raise exceptions.TimeoutException()
+
+
+def wait_any(futures, timeout=None):
+    """Returns the first of the futures to complete"""
+    for future in as_completed(futures, timeout):
+        return future
+
+
+def wait_all(futures, timeout=None):
+    """
+    Waits for all of the futures and returns their results in order. The
+    exception of the first future to fail is raised as soon as it fails,
+    without waiting for the others.
+    """
+    futures = list(futures)
+    for future in as_completed(futures, timeout):
+        future.result()
+    return [future.result() for future in futures]
+
+
+class WorkerPool(object):
+
+    """
+    Fixed-size pool of daemon threads that run submitted calls and report
+    their outcome through Futures. The number of threads bounds how many
+    calls are in flight at once, however many are submitted.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._queue = Queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _start_workers(self):
+        with self._lock:
+            while len(self._threads) < self.size:
+                thread = threading.Thread(target=self._work)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, func, args, kwargs = item
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                future.set_exception()
+            else:
+                future.set_result(result)
+
+    def submit(self, func, *args, **kwargs):
+        """Schedules func(*args, **kwargs) and returns its Future"""
+        if not self._threads:
+            self._start_workers()
+        future = Future()
+        self._queue.put((future, func, args, kwargs))
+        return future
+
+    def map(self, func, iterable):
+        """Submits func for every item and returns the list of Futures"""
+        return [self.submit(func, item) for item in iterable]
+
+    def shutdown(self, wait=True):
+        """Stops the workers once the calls already submitted are done"""
+        with self._lock:
+            threads = self._threads
+            self._threads = []
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
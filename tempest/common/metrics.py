@@ -0,0 +1,320 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Per-endpoint request metrics for the REST clients.
+
+Every request is recorded under its HTTP method, a URL template in which
+resource ids are replaced by {id} (e.g. servers/{id}/action) and, for
+server actions, the name of the action. Latencies go into log-bucketed
+histograms that can be merged across processes and runs.
+"""
+
+import atexit
+import csv
+import json
+import logging
+import math
+import os
+import re
+import threading
+import urlparse
+
+LOG = logging.getLogger(__name__)
+
+# all digits, or a UUID with or without dashes
+_ID_RE = re.compile(r'^(\d+|[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?'
+                    r'[0-9a-f]{4}-?[0-9a-f]{12})$', re.IGNORECASE)
+
+
+def is_id(segment):
+    """Whether a path segment is a numeric or UUID resource id"""
+    return bool(_ID_RE.match(segment))
+
+
+def normalize_url(url):
+    """
+    Returns the URL template for a request URL or path, replacing with
+    {id} every path segment that is a resource id. Other segments, e.g.
+    v2.0 or OS-EC2, are kept.
+    """
+    if '://' in url:
+        url = urlparse.urlsplit(url).path
+    url = url.split('?', 1)[0].strip('/')
+    segments = []
+    for segment in url.split('/'):
+        if not segment:
+            continue
+        if is_id(segment):
+            segment = '{id}'
+        segments.append(segment)
+    return '/'.join(segments)
+
+
+def get_action(template, body):
+    """Returns the action name of a servers/{id}/action request body"""
+    if not template.endswith('/action') or not body:
+        return None
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    if isinstance(payload, dict) and len(payload) == 1:
+        return payload.keys()[0]
+    return None
+
+
+class Histogram(object):
+
+    """
+    Latency histogram with logarithmically sized buckets, so that every
+    recorded value is known to within GROWTH - 1 (10%) of its real value
+    regardless of magnitude. Two histograms are merged by adding their
+    bucket counts.
+    """
+
+    MIN_VALUE = 0.0001
+    GROWTH = 1.1
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        if value <= self.MIN_VALUE:
+            return 0
+        return int(math.log(value / self.MIN_VALUE, self.GROWTH)) + 1
+
+    def _upper_bound(self, index):
+        return self.MIN_VALUE * self.GROWTH ** index
+
+    def add(self, value):
+        index = self._index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for index, count in other.buckets.iteritems():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                if self.min is None or value < self.min:
+                    self.min = value
+                if self.max is None or value > self.max:
+                    self.max = value
+
+    def percentile(self, percent):
+        """Returns an upper bound for the given percentile (0-100)"""
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * percent / 100.0)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def mean(self):
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def to_dict(self):
+        return {'buckets': dict((str(k), v)
+                                for k, v in self.buckets.iteritems()),
+                'count': self.count, 'total': self.total,
+                'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.buckets = dict((int(k), v)
+                                 for k, v in data['buckets'].iteritems())
+        histogram.count = data['count']
+        histogram.total = data['total']
+        histogram.min = data['min']
+        histogram.max = data['max']
+        return histogram
+
+
+class RequestStats(object):
+
+    """Counters and latency histogram for one method/URL template/action"""
+
+    def __init__(self):
+        self.statuses = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = Histogram()
+
+    def add(self, status, elapsed, bytes_sent, bytes_received):
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.bytes_sent += bytes_sent
+        self.bytes_received += bytes_received
+        self.latency.add(elapsed)
+
+    def merge(self, other):
+        for status, count in other.statuses.iteritems():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        self.latency.merge(other.latency)
+
+    def to_dict(self):
+        return {'statuses': self.statuses,
+                'bytes_sent': self.bytes_sent,
+                'bytes_received': self.bytes_received,
+                'latency': self.latency.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.statuses = dict((str(k), v)
+                              for k, v in data['statuses'].iteritems())
+        stats.bytes_sent = data['bytes_sent']
+        stats.bytes_received = data['bytes_received']
+        stats.latency = Histogram.from_dict(data['latency'])
+        return stats
+
+
+class MetricsRegistry(object):
+
+    """Thread-safe collection of RequestStats keyed by request kind"""
+
+    CSV_FIELDS = ('method', 'url', 'action', 'count', 'statuses',
+                  'bytes_sent', 'bytes_received', 'mean', 'min',
+                  'p50', 'p90', 'p99', 'max')
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, method, url, body, status, elapsed, bytes_received):
+        """
+        Records one request. `status` is the HTTP status code, or None if
+        no response was received.
+        """
+        template = normalize_url(url)
+        key = (method, template, get_action(template, body))
+        status = str(status) if status is not None else 'error'
+        bytes_sent = len(body) if body else 0
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = RequestStats()
+            stats.add(status, elapsed, bytes_sent, bytes_received)
+
+    def get_stats(self, method, url, action=None):
+        """Returns the RequestStats for a URL template, if any"""
+        return self._stats.get((method, url, action))
+
+    def merge(self, other):
+        with self._lock:
+            for key, stats in other._stats.items():
+                if key not in self._stats:
+                    self._stats[key] = RequestStats()
+                self._stats[key].merge(stats)
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+    def to_list(self):
+        with self._lock:
+            items = sorted(self._stats.items())
+        return [{'method': method, 'url': url, 'action': action,
+                 'stats': stats.to_dict()}
+                for (method, url, action), stats in items]
+
+    def dump_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_list(), f, indent=1)
+
+    def dump_csv(self, path):
+        with self._lock:
+            items = sorted(self._stats.items())
+        with open(path, 'wb') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.CSV_FIELDS)
+            for (method, url, action), stats in items:
+                latency = stats.latency
+                statuses = ' '.join('%s:%d' % item
+                                    for item in sorted(stats.statuses.items()))
+                writer.writerow([method, url, action or '', latency.count,
+                                 statuses, stats.bytes_sent,
+                                 stats.bytes_received, latency.mean(),
+                                 latency.min, latency.percentile(50),
+                                 latency.percentile(90),
+                                 latency.percentile(99), latency.max])
+
+    def dump(self, path):
+        """Writes the metrics as CSV if path ends in .csv, else as JSON"""
+        if path.endswith('.csv'):
+            self.dump_csv(path)
+        else:
+            self.dump_json(path)
+
+    @classmethod
+    def load(cls, path):
+        """Reads back a registry written by dump_json"""
+        registry = cls()
+        with open(path) as f:
+            for item in json.load(f):
+                key = (item['method'], item['url'], item['action'])
+                registry._stats[key] = RequestStats.from_dict(item['stats'])
+        return registry
+
+
+_registry = MetricsRegistry()
+_dump_registered = False
+_dump_lock = threading.Lock()
+
+
+def _dump_at_exit(path):
+    try:
+        _registry.dump(path)
+    except Exception:
+        LOG.exception("Failed to write request metrics to %s" % path)
+
+
+def get_registry(config=None):
+    """
+    Returns the process-wide metrics registry. If `config` sets
+    [http] metrics_file, the metrics are written to that file when the
+    process exits; a {pid} in the path is replaced by the process id so
+    that parallel workers do not overwrite each other.
+    """
+    global _dump_registered
+    if config is not None and config.http.metrics_file:
+        with _dump_lock:
+            if not _dump_registered:
+                path = config.http.metrics_file.replace('{pid}',
+                                                       str(os.getpid()))
+                atexit.register(_dump_at_exit, path)
+                _dump_registered = True
+    return _registry
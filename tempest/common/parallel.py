@@ -0,0 +1,409 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Runs the test classes of a nose selection in parallel worker processes.
+
+The classes are split into one shard per worker. A class is never split,
+so its setUpClass fixtures run exactly once. The shards are balanced
+longest-processing-time-first: from the longest to the shortest, by the
+durations their tests took in earlier runs, each class goes to the shard
+with the least work so far. Of classes expected to take as long, the one
+that failed most recently goes first. Without a history of durations,
+the classes are weighted by their number of tests instead.
+
+Each worker is a nosetests process with a copy of the Tempest
+configuration in which allow_tenant_isolation is set, so that every
+class of every worker runs in its own tenant. The workers write xunit
+reports, which are merged into one report and one summary once they are
+all done, and their test durations are added to the history.
+
+    python -m tempest.common.parallel -j 4 [nose options] [tests]
+
+Nose options are recognized with nose's own option parser, so their
+values may be given as separate arguments, e.g. -a type=smoke.
+
+run_tests.sh --parallel=N does the same.
+"""
+
+import ConfigParser
+import heapq
+import optparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from xml.dom import minidom
+
+import nose.case
+import nose.config
+import nose.failure
+import nose.loader
+import nose.plugins.manager
+
+from tempest import config
+from tempest.common import durations
+
+DEFAULT_WORKERS = 4
+
+
+def _class_name(test):
+    """Returns the module:Class name of a nose test, or its module"""
+    test = test.test
+    if isinstance(test, nose.failure.Failure):
+        # e.g. an import error, let the worker report it
+        return test.address()[1]
+    if isinstance(test, nose.case.FunctionTestCase):
+        return test.test.__module__
+    if isinstance(test, nose.case.MethodTestCase):
+        cls = test.cls
+    else:
+        cls = test.__class__
+    return '%s:%s' % (cls.__module__, cls.__name__)
+
+
+def _walk(suite):
+    for test in suite:
+        if isinstance(test, nose.case.Test):
+            yield test
+        else:
+            for child in _walk(test):
+                yield child
+
+
+def discover(names):
+    """
+    Returns {module:Class: [test ids]} of the tests nose finds under the
+    given names, e.g. ['tempest'] or ['tempest/tests/compute']
+    """
+    loader = nose.loader.TestLoader()
+    classes = {}
+    for test in _walk(loader.loadTestsFromNames(names)):
+        classes.setdefault(_class_name(test), []).append(test.id())
+    return classes
+
+
+def shard(weights, workers, priorities=None):
+    """
+    Splits {class: weight} into at most `workers` lists of classes,
+    assigning the heaviest remaining class to the lightest shard. Classes
+    of equal weight are assigned by decreasing priority, e.g. the time
+    they last failed.
+    """
+    priorities = priorities or {}
+    order = sorted(weights, key=lambda name: (-weights[name],
+                                              -priorities.get(name, 0),
+                                              name))
+    shards = [(0, index, []) for index in xrange(min(workers, len(weights)))]
+    heapq.heapify(shards)
+    for name in order:
+        load, index, classes = heapq.heappop(shards)
+        classes.append(name)
+        heapq.heappush(shards, (load + weights[name], index, classes))
+    return [classes for load, index, classes in sorted(shards,
+                                                     key=lambda s: s[1])]
+
+
+def write_worker_config(path, directory):
+    """
+    Copies the Tempest configuration at `path` to `directory` with tenant
+    isolation turned on and returns the path of the copy
+    """
+    conf = ConfigParser.RawConfigParser()
+    conf.read(path)
+    if not conf.has_section('compute'):
+        conf.add_section('compute')
+    conf.set('compute', 'allow_tenant_isolation', 'true')
+    worker_path = os.path.join(directory, 'tempest.conf')
+    with open(worker_path, 'w') as f:
+        conf.write(f)
+    return worker_path
+
+
+class Worker(object):
+
+    """A nosetests process running one shard of test classes"""
+
+    def __init__(self, index, classes, nose_args, directory, config_path):
+        self.index = index
+        self.classes = classes
+        self.report = os.path.join(directory, 'worker-%d.xml' % index)
+        self.log = os.path.join(directory, 'worker-%d.log' % index)
+        self.command = ([sys.executable, '-m', 'nose'] + list(nose_args) +
+                        ['--with-xunit', '--xunit-file=%s' % self.report] +
+                        list(classes))
+        self.env = dict(os.environ)
+        self.env['TEMPEST_CONFIG_DIR'] = os.path.dirname(config_path)
+        self.env['TEMPEST_CONFIG'] = os.path.basename(config_path)
+        self.process = None
+        self.returncode = None
+
+    def start(self):
+        with open(self.log, 'w') as log:
+            self.process = subprocess.Popen(self.command, env=self.env,
+                                            stdout=log,
+                                            stderr=subprocess.STDOUT)
+
+    def wait(self):
+        self.returncode = self.process.wait()
+        return self.returncode
+
+
+def _text(node):
+    return ''.join(child.data for child in node.childNodes
+                   if child.nodeType in (child.TEXT_NODE,
+                                         child.CDATA_SECTION_NODE))
+
+
+class Results(object):
+
+    """Test cases of the xunit reports of several workers"""
+
+    def __init__(self):
+        self.cases = []
+        self.missing = []
+
+    def add_report(self, path, worker=None):
+        """Adds the test cases of an xunit report"""
+        if not os.path.exists(path):
+            self.missing.append(worker if worker is not None else path)
+            return
+        document = minidom.parse(path)
+        for case in document.getElementsByTagName('testcase'):
+            outcome = 'success'
+            detail = ''
+            for tag in ('error', 'failure', 'skipped'):
+                nodes = case.getElementsByTagName(tag)
+                if nodes:
+                    outcome = tag
+                    detail = (_text(nodes[0]) or
+                              nodes[0].getAttribute('message'))
+                    break
+            self.cases.append({'classname': case.getAttribute('classname'),
+                               'name': case.getAttribute('name'),
+                               'time': float(case.getAttribute('time') or 0),
+                               'outcome': outcome,
+                               'detail': detail})
+
+    def count(self, outcome):
+        return len([case for case in self.cases
+                    if case['outcome'] == outcome])
+
+    def successful(self):
+        return not (self.missing or self.count('error') or
+                    self.count('failure'))
+
+    def write_xunit(self, path):
+        """Writes the merged test cases as one xunit report"""
+        document = minidom.Document()
+        suite = document.createElement('testsuite')
+        suite.setAttribute('name', 'nosetests')
+        suite.setAttribute('tests', str(len(self.cases)))
+        suite.setAttribute('errors', str(self.count('error')))
+        suite.setAttribute('failures', str(self.count('failure')))
+        suite.setAttribute('skip', str(self.count('skipped')))
+        document.appendChild(suite)
+        for case in self.cases:
+            node = document.createElement('testcase')
+            node.setAttribute('classname', case['classname'])
+            node.setAttribute('name', case['name'])
+            node.setAttribute('time', '%.3f' % case['time'])
+            if case['outcome'] != 'success':
+                child = document.createElement(case['outcome'])
+                child.appendChild(document.createCDATASection(case['detail']))
+                node.appendChild(child)
+            suite.appendChild(node)
+        with open(path, 'w') as f:
+            f.write(document.toprettyxml(encoding='utf-8'))
+
+    def record(self, history):
+        """Adds the durations of the tests that ran to a DurationHistory"""
+        for case in self.cases:
+            if case['outcome'] == 'skipped':
+                continue
+            history.record('%s.%s' % (case['classname'], case['name']),
+                           case['time'],
+                           case['outcome'] in ('error', 'failure'))
+
+    def summary(self, stream, elapsed):
+        for case in self.cases:
+            if case['outcome'] in ('error', 'failure'):
+                stream.write('=' * 70 + '\n')
+                stream.write('%s: %s (%s)\n' % (case['outcome'].upper(),
+                                                case['name'],
+                                                case['classname']))
+                stream.write('-' * 70 + '\n')
+                stream.write(case['detail'].encode('utf-8') + '\n')
+        for worker in self.missing:
+            stream.write('Worker %s did not report, see its log\n' % worker)
+        stream.write('-' * 70 + '\n')
+        stream.write('Ran %d tests in %.3fs\n\n' % (len(self.cases), elapsed))
+        counts = [(label, self.count(outcome))
+                  for label, outcome in (('SKIP', 'skipped'),
+                                         ('errors', 'error'),
+                                         ('failures', 'failure'))]
+        counts = ', '.join('%s=%d' % item for item in counts if item[1])
+        status = 'OK' if self.successful() else 'FAILED'
+        stream.write(status + (' (%s)' % counts if counts else '') + '\n')
+
+
+def schedule(classes, workers, history=None):
+    """
+    Returns the shards of {class: [test ids]} for `workers` workers,
+    weighting the classes by the DurationHistory if given and by their
+    number of tests otherwise
+    """
+    if history is None:
+        weights = dict((name, len(tests))
+                       for name, tests in classes.items())
+        return shard(weights, workers)
+    weights = dict((name, history.estimate(tests))
+                   for name, tests in classes.items())
+    priorities = dict((name, history.latest_failure(tests))
+                      for name, tests in classes.items())
+    return shard(weights, workers, priorities)
+
+
+def run(names, workers=DEFAULT_WORKERS, nose_args=(), xunit_file=None,
+        durations_file=durations.DEFAULT_FILE, stream=sys.stdout):
+    """
+    Runs the test classes found under `names` in `workers` processes and
+    returns the merged Results. The durations of the tests are read from
+    and added to `durations_file` unless it is None.
+    """
+    start = time.time()
+    history = None
+    if durations_file:
+        history = durations.DurationHistory(durations_file)
+    shards = schedule(discover(names), workers, history)
+    directory = tempfile.mkdtemp(prefix='tempest-parallel-')
+    try:
+        running = []
+        for index, classes in enumerate(shards):
+            worker_dir = os.path.join(directory, str(index))
+            os.mkdir(worker_dir)
+            config_path = write_worker_config(config.TempestConfig().path,
+                                              worker_dir)
+            worker = Worker(index, classes, nose_args, directory,
+                            config_path)
+            worker.start()
+            running.append(worker)
+        stream.write('Running %d test classes in %d workers\n' %
+                     (sum(len(classes) for classes in shards), len(running)))
+
+        results = Results()
+        for worker in running:
+            worker.wait()
+            results.add_report(worker.report, worker.index)
+            if worker.returncode != 0:
+                with open(worker.log) as log:
+                    stream.write('Worker %d (exit status %d) log:\n%s\n' %
+                                 (worker.index, worker.returncode,
+                                  log.read()))
+        if xunit_file:
+            results.write_xunit(xunit_file)
+        if history is not None:
+            results.record(history)
+            history.save()
+        results.summary(stream, time.time() - start)
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _option_parser():
+    parser = optparse.OptionParser(
+        usage='%prog [-j WORKERS] [nose options] [tests]')
+    parser.add_option('-j', '--workers', type='int', default=DEFAULT_WORKERS,
+                      help='number of worker processes')
+    parser.add_option('--merged-xunit-file', dest='xunit_file',
+                      help='write the merged results to this xunit file')
+    parser.add_option('--durations-file', default=durations.DEFAULT_FILE,
+                      help='history of test durations used to balance the '
+                           'workers, empty to balance by number of tests')
+    return parser
+
+
+def _find_option(parsers, arg):
+    """
+    Returns the index of the parser that knows the option `arg`, which
+    may be abbreviated or clustered, and whether it takes a value given
+    as the next argument. Returns None as the index of unknown options.
+    """
+    if arg.startswith('--'):
+        name = arg.split('=', 1)[0]
+        for index, parser in enumerate(parsers):
+            try:
+                option = parser.get_option(parser._match_long_opt(name))
+            except optparse.BadOptionError:
+                continue
+            return index, option.takes_value() and '=' not in arg
+        return None, False
+    # e.g. -vsa: the value of the first option taking one is the rest of
+    # the argument or, if there is no rest, the next argument
+    index = None
+    for position, char in enumerate(arg[1:], 2):
+        for index, parser in enumerate(parsers):
+            option = parser.get_option('-' + char)
+            if option is not None:
+                break
+        else:
+            return None, False
+        if option.takes_value():
+            return index, position == len(arg)
+    return index, False
+
+
+def split_args(runner_parser, nose_parser, args):
+    """
+    Splits command line arguments into the runner's options, nose's
+    options and test names, keeping every option with its value
+    """
+    own, nose_args, names = [], [], []
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        if arg == '--':
+            names.extend(args)
+            break
+        if not arg.startswith('-') or arg == '-':
+            names.append(arg)
+            continue
+        index, takes_next = _find_option([runner_parser, nose_parser], arg)
+        target = own if index == 0 else nose_args
+        target.append(arg)
+        if takes_next and args:
+            target.append(args.pop(0))
+    return own, nose_args, names
+
+
+def main(argv=None):
+    parser = _option_parser()
+    nose_parser = nose.config.Config(
+        plugins=nose.plugins.manager.DefaultPluginManager()).getParser()
+    argv = list(sys.argv[1:] if argv is None else argv)
+    own, nose_args, names = split_args(parser, nose_parser, argv)
+    options, _ = parser.parse_args(own)
+    results = run(names or ['tempest'], options.workers, nose_args,
+                  options.xunit_file, options.durations_file)
+    return 0 if results.successful() else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
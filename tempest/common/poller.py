@@ -0,0 +1,231 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Waiting for many resources to reach a status with one detailed listing
+per polling interval instead of one GET per resource.
+"""
+
+import logging
+import threading
+import time
+
+from tempest import exceptions
+from tempest.common.futures import Future
+from tempest.common.futures import wait_all
+
+LOG = logging.getLogger(__name__)
+
+
+class _Wait(object):
+
+    def __init__(self, resource_id, status, timeout):
+        self.resource_id = resource_id
+        self.status = status
+        self.timeout = timeout
+        self.start = time.time()
+        self.deadline = self.start + timeout
+        self.future = Future()
+        self.schedule = None
+        self.observer = None
+
+
+class StatusPoller(object):
+
+    """
+    Resolves outstanding status waits from a single detailed listing per
+    tick. A background thread runs while waits are outstanding; each tick
+    it calls list_resources() once and completes the Future of every wait
+    whose resource reached the expected status, went to the error status
+    or ran out of time. Resources missing from the listing, e.g. because
+    it was truncated or they belong to another tenant, are fetched with
+    get_resource() instead.
+
+    If a schedule factory is given, the interval between ticks is the
+    shortest interval asked for by the PollSchedules of the waits, and
+    the transition durations of resolved waits are recorded. If an
+    observer factory is given, every status seen is passed to the
+    StatusObserver of the wait.
+    """
+
+    def __init__(self, list_resources, get_resource, interval, timeout,
+                 error_status='ERROR', error=None, kind='Resource',
+                 schedule=None, observer=None):
+        """
+        :param list_resources: Callable returning a list of resource dicts
+        :param get_resource: Callable returning the resource dict with the
+                             given id
+        :param interval: Seconds between listings
+        :param timeout: Seconds after which a wait fails
+        :param error_status: Status in which a resource never recovers
+        :param error: Callable returning the exception raised for the id
+                      of a resource in error_status
+        :param kind: Name of the resources used in error messages
+        :param schedule: Callable returning the PollSchedule of a wait
+                         given the resource when first seen, the expected
+                         status and the time the wait started
+        :param observer: Callable returning the StatusObserver of a wait
+                         given the resource when first seen
+        """
+        self.list_resources = list_resources
+        self.get_resource = get_resource
+        self.interval = interval
+        self.timeout = timeout
+        self.error_status = error_status
+        self.error = error
+        self.kind = kind
+        self.schedule = schedule
+        self.observer = observer
+        self.ticks = 0
+        self._waits = []
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def watch(self, resource_id, status, timeout=None):
+        """
+        Returns a Future resolved with the resource dict once the resource
+        reaches `status`. The Future raises the error exception if the
+        resource goes to the error status and TimeoutException if neither
+        happens within `timeout` seconds, the poller's timeout by default.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        wait = _Wait(str(resource_id), status, timeout)
+        with self._lock:
+            self._waits.append(wait)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+        return wait.future
+
+    def watch_all(self, resource_ids, status, timeout=None):
+        """
+        Returns a Future per resource, see watch(). `status` is either the
+        status expected of every resource or a list with one per resource.
+        """
+        resource_ids = list(resource_ids)
+        if isinstance(status, basestring):
+            status = [status] * len(resource_ids)
+        return [self.watch(resource_id, resource_status, timeout)
+                for resource_id, resource_status in zip(resource_ids, status)]
+
+    def wait(self, resource_ids, status, timeout=None):
+        """
+        Waits until all of the resources reach their status, raising as soon
+        as any of them fails
+        """
+        return wait_all(self.watch_all(resource_ids, status, timeout))
+
+    def cancel(self, futures):
+        """
+        Stops polling for the waits of the given Futures that are not
+        resolved yet, failing them with WaitCancelled
+        """
+        futures = set(futures)
+        with self._lock:
+            cancelled = [wait for wait in self._waits
+                         if wait.future in futures]
+            self._waits = [wait for wait in self._waits
+                           if wait.future not in futures]
+        for wait in cancelled:
+            self._fail(wait, exceptions.WaitCancelled(
+                kind=self.kind.lower(), resource_id=wait.resource_id))
+
+    def pending(self):
+        with self._lock:
+            return len(self._waits)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._waits:
+                    self._thread = None
+                    return
+                waits = list(self._waits)
+            try:
+                self._poll(waits)
+            except Exception:
+                LOG.exception("Polling %s statuses failed" % self.kind)
+                for wait in waits:
+                    wait.future.set_exception()
+            with self._lock:
+                self._waits = [wait for wait in self._waits
+                               if not wait.future.done()]
+                if not self._waits:
+                    self._thread = None
+                    return
+                interval = self._next_interval()
+            time.sleep(interval)
+
+    def _next_interval(self):
+        intervals = [wait.schedule.next_interval() for wait in self._waits
+                     if wait.schedule is not None]
+        if len(intervals) < len(self._waits):
+            intervals.append(self.interval)
+        # do not sleep past the first deadline
+        deadline = min(wait.deadline for wait in self._waits)
+        intervals.append(max(0, deadline - time.time()))
+        return min(intervals)
+
+    def _poll(self, waits):
+        self.ticks += 1
+        try:
+            resources = dict((str(resource['id']), resource)
+                             for resource in self.list_resources())
+        except Exception:
+            LOG.exception("Listing %ss failed, falling back to single "
+                          "requests" % self.kind.lower())
+            resources = {}
+
+        for wait in waits:
+            resource = resources.get(wait.resource_id)
+            if resource is None:
+                try:
+                    resource = self.get_resource(wait.resource_id)
+                except Exception:
+                    wait.future.set_exception()
+                    continue
+                resources[wait.resource_id] = resource
+            self._check(wait, resource)
+
+    def _check(self, wait, resource):
+        status = resource['status']
+        if wait.schedule is None and self.schedule is not None:
+            wait.schedule = self.schedule(resource, wait.status, wait.start)
+        if wait.observer is None and self.observer is not None:
+            wait.observer = self.observer(resource)
+        if wait.observer is not None:
+            wait.observer.observe(status)
+        if status == wait.status:
+            if wait.schedule is not None:
+                wait.schedule.finished()
+            wait.future.set_result(resource)
+        elif status == self.error_status and self.error is not None:
+            self._fail(wait, self.error(wait.resource_id))
+        elif time.time() >= wait.deadline:
+            message = ('%s %s failed to reach %s status within the '
+                       'required time (%s s). Current status: %s.' %
+                       (self.kind, wait.resource_id, wait.status,
+                        wait.timeout, status))
+            self._fail(wait, exceptions.TimeoutException(message))
+
+    def _fail(self, wait, error):
+        try:
+            raise error
+        except Exception:
+            wait.future.set_exception()
@@ -0,0 +1,152 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Client-side pacing of requests according to the rate limits an endpoint
+advertises in the "rate" section of its limits resource, so that clients
+wait a little before sending instead of being rejected with a 413.
+"""
+
+import logging
+import re
+import threading
+import time
+
+LOG = logging.getLogger(__name__)
+
+UNIT_SECONDS = {'SECOND': 1, 'MINUTE': 60, 'HOUR': 3600, 'DAY': 86400}
+
+
+class TokenBucket(object):
+
+    """
+    Token bucket holding up to `capacity` tokens and refilled at `rate`
+    tokens per second. Not thread-safe; RateLimiter serializes access.
+    """
+
+    def __init__(self, rate, capacity, tokens=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        if tokens is None:
+            tokens = capacity
+        self.tokens = float(min(tokens, capacity))
+        self.last = time.time()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def reserve(self, now):
+        """
+        Takes a token and returns how many seconds the caller has to wait
+        before using it. The balance may go negative, which queues later
+        callers behind earlier ones.
+        """
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def drain(self, now, delay):
+        """Empties the bucket so the next token is `delay` seconds away"""
+        self._refill(now)
+        self.tokens = min(self.tokens, 1 - delay * self.rate)
+
+
+class RateLimiter(object):
+
+    """Thread-safe set of token buckets for the rate limits of an endpoint"""
+
+    def __init__(self):
+        self.learned = False
+        self._rules = []
+        self._lock = threading.Lock()
+
+    def learn(self, rate_limits):
+        """
+        Builds one bucket per verb and URI regex from the "rate" section
+        returned by LimitsClient.get_limits(), e.g.
+
+        [{"regex": ".*", "uri": "*",
+          "limit": [{"verb": "POST", "value": 10, "unit": "MINUTE",
+                     "remaining": 7}]}]
+        """
+        rules = []
+        for rate_limit in rate_limits:
+            regex = re.compile(rate_limit.get('regex', '.*'))
+            for limit in rate_limit.get('limit', []):
+                unit = UNIT_SECONDS.get(limit.get('unit', '').upper())
+                value = limit.get('value')
+                if not unit or not value:
+                    continue
+                bucket = TokenBucket(float(value) / unit, value,
+                                     limit.get('remaining'))
+                rules.append((limit['verb'].upper(), regex, bucket))
+        with self._lock:
+            self._rules = rules
+            self.learned = True
+
+    def _matching(self, method, path):
+        return [bucket for verb, regex, bucket in self._rules
+                if verb == method and regex.search(path)]
+
+    def reserve(self, method, path):
+        """Returns the delay before `method` on `path` may be sent"""
+        now = time.time()
+        with self._lock:
+            delays = [bucket.reserve(now)
+                      for bucket in self._matching(method, path)]
+        return max(delays or [0.0])
+
+    def acquire(self, method, path):
+        """Blocks until `method` on `path` is within the rate limits"""
+        delay = self.reserve(method, path)
+        if delay > 0:
+            LOG.debug("Pacing %s %s for %.2f seconds" % (method, path, delay))
+            time.sleep(delay)
+
+    def penalize(self, method, path, retry_after=None):
+        """
+        Accounts for a 413 response: the matching buckets are drained so
+        that the next request waits `retry_after` seconds, or one refill
+        interval if the endpoint did not say. Returns False if no known
+        limit matches the request.
+        """
+        now = time.time()
+        with self._lock:
+            buckets = self._matching(method, path)
+            for bucket in buckets:
+                if retry_after is None:
+                    bucket.drain(now, 1.0 / bucket.rate)
+                else:
+                    bucket.drain(now, retry_after)
+        return bool(buckets)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(endpoint):
+    """Returns the process-wide RateLimiter for an endpoint URL"""
+    with _limiters_lock:
+        limiter = _limiters.get(endpoint)
+        if limiter is None:
+            limiter = _limiters[endpoint] = RateLimiter()
+        return limiter
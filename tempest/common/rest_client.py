@@ -16,16 +16,24 @@
 #    under the License.
 
 import json
-import httplib2
 import logging
 import time
+import urllib
 
 from tempest import exceptions
+from tempest.common import auth_cache
+from tempest.common import cassette
+from tempest.common import metrics
+from tempest.common import rate_limiter
+from tempest.common import retry
 
 
 # redrive rate limited calls at most twice
 MAX_RECURSION_DEPTH = 2
 
+# number of items requested per page by paginate()
+DEFAULT_PAGE_SIZE = 100
+
 
 class RestClient(object):
 
@@ -41,6 +49,7 @@ class RestClient(object):
         self.service = None
         self.token = None
         self.base_url = None
+        self.auth_data = None
         self.config = config
         self.region = 0
         self.endpoint_url = 'publicURL'
@@ -49,6 +58,14 @@ class RestClient(object):
                         'Accept': 'application/json'}
         self.build_interval = config.compute.build_interval
         self.build_timeout = config.compute.build_timeout
+        self.compute_service = config.compute.catalog_type
+        # Replayed responses need no pacing, backoff or waiting
+        self.replaying = config.http.cassette_mode == cassette.REPLAY
+        self.client_rate_limiting = (config.compute.client_rate_limiting and
+                                     not self.replaying)
+        self.http_obj = cassette.get_transport(config)
+        self.metrics = metrics.get_registry(config)
+        self.retry_policy = retry.get_policy(config)
 
     def _set_auth(self):
         """
@@ -72,8 +89,12 @@ class RestClient(object):
         will fetch a new token and base_url
         """
 
+        if self.token is not None:
+            auth_cache.get_cache().invalidate(self._get_auth_key(),
+                                              self.token)
         self.token = None
         self.base_url = None
+        self.auth_data = None
 
     def get_auth(self):
         """Returns the token of the current request or sets the token if
@@ -93,16 +114,50 @@ class RestClient(object):
         params['headers'] = {'User-Agent': 'Test-Client', 'X-Auth-User': user,
                              'X-Auth-Key': password}
 
-        self.http_obj = httplib2.Http()
-        resp, body = self.http_obj.request(auth_url, 'GET', **params)
+        resp, body = self._http_request(auth_url, 'GET', **params)
         try:
             return resp['x-auth-token'], resp['x-server-management-url']
         except:
             raise
 
+    def _get_auth_key(self):
+        return self.auth_url, self.user, self.tenant_name
+
     def keystone_auth(self, user, password, auth_url, service, tenant_name):
         """
-        Provides authentication via Keystone
+        Provides authentication via Keystone. The token and service catalog
+        are shared with every other client using the same credentials.
+        """
+
+        key = (auth_url, user, tenant_name)
+        auth_data = auth_cache.get_cache().get(
+            key, lambda: self._keystone_authenticate(user, password,
+                                                     auth_url, tenant_name))
+        self.auth_data = auth_data
+        if auth_data is None:
+            return None
+
+        mgmt_url = None
+        for ep in auth_data.catalog:
+            if ep["type"] == service:
+                mgmt_url = ep['endpoints'][self.region][self.endpoint_url]
+                break
+
+        if mgmt_url == None:
+            raise exceptions.EndpointNotFound(service)
+
+        if service == 'network':
+            # Keystone does not return the correct endpoint for
+            # quantum. Handle this separately.
+            mgmt_url = mgmt_url + self.config.network.api_version + \
+                         "/tenants/" + auth_data.tenant_id
+
+        return auth_data.token, mgmt_url
+
+    def _keystone_authenticate(self, user, password, auth_url, tenant_name):
+        """
+        Requests a new token from Keystone and returns it along with the
+        service catalog as an AuthData object
         """
 
         creds = {'auth': {
@@ -114,11 +169,10 @@ class RestClient(object):
             }
         }
 
-        self.http_obj = httplib2.Http()
         headers = {'Content-Type': 'application/json'}
         body = json.dumps(creds)
-        resp, body = self.http_obj.request(auth_url, 'POST',
-                                           headers=headers, body=body)
+        resp, body = self._http_request(auth_url, 'POST',
+                                        headers=headers, body=body)
 
         if resp.status == 200:
             try:
@@ -128,23 +182,16 @@ class RestClient(object):
                 print "Failed to obtain token for user: %s" % e
                 raise
 
-            mgmt_url = None
-            for ep in auth_data['serviceCatalog']:
-                if ep["type"] == service:
-                    mgmt_url = ep['endpoints'][self.region][self.endpoint_url]
-                    tenant_id = auth_data['token']['tenant']['id']
-                    break
-
-            if mgmt_url == None:
-                raise exceptions.EndpointNotFound(service)
-
-            if service == 'network':
-                # Keystone does not return the correct endpoint for
-                # quantum. Handle this separately.
-                mgmt_url = mgmt_url + self.config.network.api_version + \
-                             "/tenants/" + tenant_id
-
-            return token, mgmt_url
+            expires = auth_cache.parse_expires(
+                auth_data['token'].get('expires'))
+            if self.replaying:
+                # A replayed token may have expired since it was recorded,
+                # but refreshing it would ask for a response never recorded
+                expires = None
+            tenant_id = auth_data['token'].get('tenant', {}).get('id')
+            return auth_cache.AuthData(token, expires,
+                                       auth_data['serviceCatalog'],
+                                       tenant_id)
 
         elif resp.status == 401:
             raise exceptions.AuthenticationFailure(user=user,
@@ -162,26 +209,110 @@ class RestClient(object):
     def put(self, url, body, headers):
         return self.request('PUT', url, headers, body)
 
+    def paginate(self, url, key, params=None, page_size=None):
+        """
+        Generator that walks a list resource one page at a time using the
+        limit and marker query parameters, yielding the items found under
+        `key` in each response. Only one page is held in memory, and no
+        further pages are fetched once the caller stops iterating.
+        """
+        page_size = page_size or DEFAULT_PAGE_SIZE
+        params = dict(params or {})
+        params['limit'] = page_size
+        while True:
+            resp, body = self.get("%s?%s" % (url, urllib.urlencode(params)))
+            items = json.loads(body)[key]
+            # A page ending at the marker it was asked to start after is
+            # the previous page again: the marker was ignored.
+            if items and items[-1]['id'] == params.get('marker'):
+                return
+            for item in items:
+                yield item
+            # A short page is the last one. A page bigger than requested
+            # means the limit was ignored and everything was returned.
+            if len(items) != page_size:
+                return
+            params['marker'] = items[-1]['id']
+
     def _log(self, req_url, body, resp, resp_body):
         self.log.error('Request URL: ' + req_url)
         self.log.error('Request Body: ' + str(body))
         self.log.error('Response Headers: ' + str(resp))
         self.log.error('Response Body: ' + str(resp_body))
 
+    def _http_request(self, req_url, method, headers=None, body=None,
+                      url=None):
+        """
+        Issues the HTTP request and records its latency, status and sizes
+        under `url` (the request URL relative to the endpoint) if given,
+        or else under the path of `req_url`
+        """
+        start = time.time()
+        try:
+            resp, resp_body = self.http_obj.request(req_url, method,
+                                                    headers=headers,
+                                                    body=body)
+        except Exception:
+            self.metrics.record(method, url or req_url, body, None,
+                                time.time() - start, 0)
+            raise
+        self.metrics.record(method, url or req_url, body, resp.status,
+                            time.time() - start, len(resp_body or ''))
+        return resp, resp_body
+
+    def _send_with_retries(self, req_url, method, headers, body, url):
+        """
+        Sends the request, retrying connection errors and transient error
+        responses for as long as the retry policy allows
+        """
+        attempt = 0
+        while True:
+            try:
+                resp, resp_body = self._http_request(req_url, method,
+                                                     headers=headers,
+                                                     body=body, url=url)
+            except Exception, e:
+                if not self.retry_policy.should_retry(attempt, method, url,
+                                                      body, error=e):
+                    raise
+                reason = e
+            else:
+                if not self.retry_policy.should_retry(attempt, method, url,
+                                                      body,
+                                                      status=resp.status):
+                    return resp, resp_body
+                reason = resp.status
+            delay = self.retry_policy.backoff(attempt)
+            self.log.warning("Retrying %s %s in %.2f seconds after: %s" %
+                             (method, req_url, delay, reason))
+            if not self.replaying:
+                time.sleep(delay)
+            attempt += 1
+
     def request(self, method, url, headers=None, body=None, depth=0):
         """A simple HTTP request interface."""
 
         if (self.token is None) or (self.base_url is None):
             self._set_auth()
+        elif (self.auth_data is not None and
+              self.auth_data.expires_within(auth_cache.EXPIRY_MARGIN)):
+            # Refresh just before expiry rather than after a failure
+            self._set_auth()
 
-        self.http_obj = httplib2.Http()
         if headers == None:
             headers = {}
         headers['X-Auth-Token'] = self.token
 
+        limiter = self._get_rate_limiter()
+        if limiter is not None:
+            limiter.acquire(method, '/' + url.lstrip('/'))
+
         req_url = "%s/%s" % (self.base_url, url)
-        resp, resp_body = self.http_obj.request(req_url, method,
-                                           headers=headers, body=body)
+        resp, resp_body = self._send_with_retries(req_url, method, headers,
+                                                  body, url)
+        if resp.status == 401 and self._reauth_after_unauthorized(depth):
+            return self.request(method, url, headers, body, depth + 1)
+
         if resp.status == 401 or resp.status == 403:
             self._log(req_url, body, resp, resp_body)
             raise exceptions.Unauthorized()
@@ -206,8 +337,17 @@ class RestClient(object):
             if 'overLimit' in resp_body:
                 raise exceptions.OverLimit(resp_body['overLimit']['message'])
             elif depth < MAX_RECURSION_DEPTH:
-                delay = resp['Retry-After'] if 'Retry-After' in resp else 60
-                time.sleep(int(delay))
+                delay = resp.get('retry-after')
+                if delay is not None:
+                    delay = int(delay)
+                path = '/' + url.lstrip('/')
+                if limiter is not None:
+                    paced = limiter.penalize(method, path, delay)
+                else:
+                    paced = False
+                if not paced and not self.replaying:
+                    # No known limit to pace against, wait as told
+                    time.sleep(delay if delay is not None else 60)
                 return self.request(method, url, headers, body, depth + 1)
             else:
                 raise exceptions.RateLimitExceeded(
@@ -236,6 +376,56 @@ class RestClient(object):
 
         return resp, resp_body
 
+    def _get_rate_limiter(self):
+        """
+        Returns the RateLimiter shared by all clients of this endpoint, or
+        None if client-side rate limiting is disabled. The limits are
+        learned from the endpoint the first time it is used.
+        """
+        if not self.client_rate_limiting:
+            return None
+        limiter = rate_limiter.get_limiter(self.base_url)
+        if not limiter.learned and self.service == self.compute_service:
+            self._learn_rate_limits(limiter)
+        return limiter
+
+    def _learn_rate_limits(self, limiter):
+        # Fetched directly rather than through request() so the lookup is
+        # itself neither paced nor rate limit handled.
+        limiter.learn([])
+        headers = {'X-Auth-Token': self.token,
+                   'Accept': 'application/json'}
+        try:
+            resp, body = self._http_request("%s/limits" % self.base_url,
+                                            'GET', headers=headers,
+                                            url='limits')
+            if resp.status == 200:
+                limiter.learn(json.loads(body)['limits'].get('rate', []))
+        except Exception:
+            self.log.exception("Unable to learn rate limits of %s" %
+                               self.base_url)
+
+    def _reauth_after_unauthorized(self, depth):
+        """
+        Drops the shared token after a 401 so that every client using it
+        authenticates again, and returns True if the request should be
+        re-driven with a fresh token. That is only the case when the token
+        was due to expire or another client has already dropped or replaced
+        it; the first client to see a revoked token still gets Unauthorized.
+        """
+        if self.auth_data is None or depth >= MAX_RECURSION_DEPTH:
+            return False
+
+        key = self._get_auth_key()
+        cached = auth_cache.get_cache().peek(key)
+        refreshed = cached is None or cached.token != self.token
+        expired = self.auth_data.expires_within(auth_cache.EXPIRY_MARGIN)
+        auth_cache.get_cache().invalidate(key, self.token)
+        self.token = None
+        self.base_url = None
+        self.auth_data = None
+        return refreshed or expired
+
     def wait_for_resource_deletion(self, id):
         """Waits for a resource to be deleted"""
         start_time = int(time.time())
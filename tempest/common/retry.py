@@ -0,0 +1,176 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Retry policy for transient failures of REST requests.
+
+Only requests that can safely be sent twice are retried: idempotent HTTP
+methods and a few server actions that do not create anything. Delays
+grow exponentially up to a cap and are drawn uniformly from zero to that
+bound ("full jitter") so that clients failing together do not retry
+together. A budget shared by the whole process limits how many retries
+a single test may spend.
+"""
+
+import httplib
+import logging
+import random
+import socket
+import threading
+
+import tempest.config
+from tempest.common import metrics
+
+LOG = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+
+# server actions that have no additional effect when repeated
+SAFE_ACTIONS = ('os-getConsoleOutput', 'changePassword')
+
+# 501 is left out on purpose: Not Implemented does not go away on retry
+RETRY_STATUSES = (500, 502, 503, 504)
+
+RETRY_ERRORS = (socket.error, httplib.HTTPException)
+
+
+class RetryBudget(object):
+
+    """Thread-safe number of retries that may still be spent"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.remaining = limit
+        self._lock = threading.Lock()
+
+    def consume(self):
+        """Takes one retry from the budget, returns False if none is left"""
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+    def reset(self):
+        with self._lock:
+            self.remaining = self.limit
+
+
+class RetryPolicy(object):
+
+    """
+    Decides whether a failed request is retried and how long to wait
+    first, and counts the retries made. Subclasses may override
+    is_retryable_request and is_transient to change what is retried.
+    """
+
+    def __init__(self, max_retries=3, base_delay=0.5, max_delay=30.0,
+                 budget=None):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def is_retryable_request(self, method, url, body):
+        if method in IDEMPOTENT_METHODS:
+            return True
+        return metrics.get_action(metrics.normalize_url(url),
+                                  body) in SAFE_ACTIONS
+
+    def is_transient(self, status=None, error=None):
+        if error is not None:
+            return isinstance(error, RETRY_ERRORS)
+        return status in RETRY_STATUSES
+
+    def backoff(self, attempt):
+        """Full jitter delay before retry number `attempt` (from 0)"""
+        return random.uniform(0, min(self.max_delay,
+                                     self.base_delay * 2 ** attempt))
+
+    def should_retry(self, attempt, method, url, body, status=None,
+                     error=None):
+        """
+        Returns True if the request should be sent again after a failure
+        with the given response status or exception. A retry is taken
+        from the budget and counted when True is returned.
+        """
+        if attempt >= self.max_retries:
+            return False
+        if not self.is_transient(status, error):
+            return False
+        if not self.is_retryable_request(method, url, body):
+            return False
+        if self.budget is not None and not self.budget.consume():
+            LOG.warning("Retry budget exhausted, not retrying %s %s" %
+                        (method, url))
+            return False
+        reason = error.__class__.__name__ if error is not None else status
+        with self._lock:
+            self.counters[reason] = self.counters.get(reason, 0) + 1
+        return True
+
+    def total_retries(self):
+        return sum(self.counters.values())
+
+
+_budget = None
+_policy = None
+_lock = threading.Lock()
+
+
+def get_budget(config=None):
+    """
+    Returns the process-wide retry budget of [http] retry_budget retries,
+    read from `config` or else from the default configuration
+    """
+    global _budget
+    with _lock:
+        if _budget is None:
+            if config is None:
+                config = tempest.config.TempestConfig()
+            _budget = RetryBudget(config.http.retry_budget)
+    return _budget
+
+
+def get_policy(config):
+    """
+    Returns the process-wide default retry policy, configured from the
+    [http] section, so retry counters cover every client
+    """
+    global _policy
+    budget = get_budget(config)
+    with _lock:
+        if _policy is None:
+            _policy = RetryPolicy(config.http.retry_max_retries,
+                                  config.http.retry_base_delay,
+                                  config.http.retry_max_delay,
+                                  budget)
+    return _policy
+
+
+class RetryBudgetMixin(object):
+
+    """
+    Test case mixin giving every test the full retry budget, by resetting
+    the process-wide budget before the test runs
+    """
+
+    def run(self, result=None):
+        get_budget().reset()
+        return super(RetryBudgetMixin, self).run(result)
@@ -0,0 +1,228 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Pools of ACTIVE servers booted ahead of the tests that use them.
+
+A test leases a server instead of booting one and releases it when done.
+Released servers are rebuilt from the pool's image, or replaced if they
+no longer match the pool's flavor or are not ACTIVE, and go back to the
+pool; meanwhile the pool boots servers in the background to stay at its
+size. Pools are shared by every test using the same credentials, image
+and flavor, and their servers are deleted when the process exits.
+"""
+
+import atexit
+import logging
+import threading
+
+from tempest import exceptions
+from tempest.common.futures import WorkerPool
+from tempest.common.futures import wait_any
+from tempest.common.utils.data_utils import rand_name
+
+LOG = logging.getLogger(__name__)
+
+
+class ServerPool(object):
+
+    """Servers of one image and flavor, ready to be leased"""
+
+    def __init__(self, client, image_ref, flavor_ref, size):
+        """
+        :param client: ServersClient the servers are booted with
+        :param image_ref: Image of the servers
+        :param flavor_ref: Flavor of the servers
+        :param size: Number of servers kept booted or booting
+        """
+        self.client = client
+        self.image_ref = image_ref
+        self.flavor_ref = flavor_ref
+        self.size = size
+        self.boots = 0
+        self.rebuilds = 0
+        self.leased = {}
+        self.closed = False
+        # Futures of the servers being booted or rebuilt, and of the idle
+        # ones, each resolving to the server's details
+        self._futures = []
+        self._workers = WorkerPool(size)
+        self._lock = threading.Lock()
+
+    def _boot(self):
+        self.boots += 1
+        resp, server = self.client.create_server(rand_name('pool-server'),
+                                                 self.image_ref,
+                                                 self.flavor_ref)
+        return self._wait_active(server)
+
+    def _wait_active(self, server):
+        try:
+            self.client.wait_for_server_status(server['id'], 'ACTIVE')
+        except Exception:
+            self._delete(server['id'])
+            raise
+        resp, details = self.client.get_server(server['id'])
+        details['adminPass'] = server.get('adminPass')
+        return details
+
+    def _reset(self, server, rebuild):
+        """Returns a released server to its initial state"""
+        try:
+            resp, current = self.client.get_server(server['id'])
+        except exceptions.NotFound:
+            return self._boot()
+        if (current['status'] != 'ACTIVE' or
+            str(current['flavor']['id']) != str(self.flavor_ref)):
+            # e.g. resized or broken by the test, start over
+            self._delete(server['id'])
+            return self._boot()
+        if not rebuild:
+            current['adminPass'] = server.get('adminPass')
+            return current
+        self.rebuilds += 1
+        resp, rebuilt = self.client.rebuild(server['id'], self.image_ref,
+                                            name=rand_name('pool-server'),
+                                            meta={})
+        return self._wait_active(rebuilt)
+
+    def _delete(self, server_id):
+        try:
+            self.client.delete_server(server_id)
+        except exceptions.NotFound:
+            pass
+        except Exception:
+            LOG.exception("Failed to delete pooled server %s" % server_id)
+
+    def _fill(self):
+        while len(self._futures) + len(self.leased) < self.size:
+            self._futures.append(self._workers.submit(self._boot))
+
+    def fill(self):
+        """Starts booting servers until the pool is at its size"""
+        with self._lock:
+            self._fill()
+
+    def lease(self, timeout=None):
+        """
+        Returns the details of an ACTIVE server, with its adminPass, for
+        the exclusive use of the caller until release(). Waits for a
+        server to finish booting if none is ready, and raises the error of
+        the boot if it failed.
+        """
+        if timeout is None:
+            timeout = self.client.build_timeout
+        while True:
+            with self._lock:
+                if self.closed:
+                    raise exceptions.TempestException('Server pool closed')
+                if not self._futures:
+                    # every server is leased, grow past the size
+                    self._futures.append(self._workers.submit(self._boot))
+                futures = list(self._futures)
+            future = wait_any(futures, timeout)
+            with self._lock:
+                if future not in self._futures:
+                    # leased by another thread
+                    continue
+                self._futures.remove(future)
+                try:
+                    server = future.result()
+                finally:
+                    self._fill()
+                self.leased[server['id']] = server
+                return server
+
+    def release(self, server, rebuild=True):
+        """
+        Gives back a leased server. With `rebuild`, the server is rebuilt
+        from the pool's image, which drops any change a test made to its
+        name, metadata, password or disk; otherwise it is only checked to
+        still be ACTIVE with the pool's flavor.
+        """
+        with self._lock:
+            server = self.leased.pop(server['id'], server)
+            if self.closed or len(self._futures) >= self.size:
+                self._workers.submit(self._delete, server['id'])
+                return
+            self._futures.append(self._workers.submit(self._reset, server,
+                                                      rebuild))
+
+    def close(self):
+        """Deletes the servers of the pool, including any still leased"""
+        with self._lock:
+            self.closed = True
+            futures = self._futures
+            self._futures = []
+            leased = self.leased.values()
+            self.leased = {}
+        for server in leased:
+            self._delete(server['id'])
+        for future in futures:
+            try:
+                server = future.result(self.client.build_timeout)
+            except Exception:
+                continue
+            self._delete(server['id'])
+        self._workers.shutdown()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _close_all():
+    with _pools_lock:
+        pools = _pools.values()
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(_close_all)
+
+
+def _credentials(client):
+    return client.auth_url, client.user, client.tenant_name
+
+
+def get_pool(client, image_ref, flavor_ref, size=None):
+    """
+    Returns the process-wide pool of servers of the given image and
+    flavor for the credentials of `client`, creating it with `size`
+    servers, by default the [compute] server_pool_size option
+    """
+    key = _credentials(client) + (image_ref, flavor_ref)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if size is None:
+                size = client.config.compute.server_pool_size
+            pool = _pools[key] = ServerPool(client, image_ref, flavor_ref,
+                                            max(1, size))
+    pool.fill()
+    return pool
+
+
+def close_pools(client):
+    """Deletes the pooled servers of the credentials of `client`"""
+    credentials = _credentials(client)
+    with _pools_lock:
+        keys = [key for key in _pools if key[:3] == credentials]
+        pools = [_pools.pop(key) for key in keys]
+    for pool in pools:
+        pool.close()
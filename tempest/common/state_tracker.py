@@ -0,0 +1,105 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Local table of the servers of a tenant, kept current by asking the
+Compute API only for the servers that changed since the previous poll.
+"""
+
+import email.utils
+import logging
+import threading
+import time
+
+LOG = logging.getLogger(__name__)
+
+# seconds subtracted from the server's clock when asking for changes, as
+# changes-since has a resolution of one second
+SINCE_MARGIN = 1
+
+
+def _server_time(resp):
+    """Returns the time of a response from its Date header, or local time"""
+    date = resp.get('date') if resp is not None else None
+    parsed = email.utils.parsedate_tz(date) if date else None
+    if parsed is None:
+        return time.time()
+    return email.utils.mktime_tz(parsed)
+
+
+class ServerStateTracker(object):
+
+    """
+    Id-indexed table of detailed servers. The first refresh() lists every
+    server; later ones only request servers/detail?changes-since=<time of
+    the previous listing> and merge the changed rows, dropping servers
+    reported as DELETED. The time is taken from the Date header of the
+    previous response so the client and server clocks need not agree.
+    """
+
+    def __init__(self, client):
+        """:param client: ServersClient used for the listings"""
+        self.client = client
+        self.servers = {}
+        self.since = None
+        self.full_listings = 0
+        self.delta_listings = 0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Brings the table up to date and returns the changed servers"""
+        with self._lock:
+            if self.since is None:
+                resp, body = self.client.list_servers_with_detail()
+                self.servers = {}
+                self.full_listings += 1
+            else:
+                since = time.strftime('%Y-%m-%dT%H:%M:%SZ',
+                                      time.gmtime(self.since))
+                resp, body = self.client.list_servers_with_detail(
+                    {'changes-since': since})
+                self.delta_listings += 1
+            self.since = _server_time(resp) - SINCE_MARGIN
+
+            changed = body['servers']
+            for server in changed:
+                if server['status'] == 'DELETED':
+                    self.servers.pop(server['id'], None)
+                else:
+                    self.servers[server['id']] = server
+            return changed
+
+    def reset(self):
+        """Makes the next refresh() list every server again"""
+        with self._lock:
+            self.since = None
+
+    def get(self, server_id):
+        """Returns the last known details of a server, or None"""
+        with self._lock:
+            return self.servers.get(server_id)
+
+    def list(self):
+        """Returns the last known details of every server"""
+        with self._lock:
+            return self.servers.values()
+
+    def with_status(self, status):
+        """Returns the last known servers in the given status"""
+        with self._lock:
+            return [server for server in self.servers.values()
+                    if server['status'] == status]
@@ -0,0 +1,215 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Persistent record of the status transitions observed by the waiters.
+
+Each time a waiter sees a server, volume or image in a status different
+from the one it saw before, a row is added to a SQLite database with the
+time of the observation, the time spent in the previous status, the
+image and flavor of the server and the id of the run. The database is
+kept across runs so that e.g. the p50/p95 of BUILD -> ACTIVE can be
+followed over weeks, see trend() and tools/telemetry_report.py.
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from tempest.common import cassette
+
+LOG = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transitions (
+    run_id TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    from_status TEXT NOT NULL,
+    to_status TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    observed_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    image_ref TEXT,
+    flavor_ref TEXT
+);
+CREATE INDEX IF NOT EXISTS transitions_by_status
+    ON transitions (resource_type, from_status, to_status, observed_at);
+"""
+
+
+def percentile(values, percent):
+    """Returns the nearest-rank percentile (0-100) of values, or None"""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = int(math.ceil(len(values) * percent / 100.0))
+    return values[max(rank, 1) - 1]
+
+
+def new_run_id():
+    """Returns an id for the runs of this process, sortable by start time"""
+    return '%s-%d' % (time.strftime('%Y%m%dT%H%M%S'), os.getpid())
+
+
+class TelemetryStore(object):
+
+    """Thread-safe writer and reader of a transitions database"""
+
+    def __init__(self, path, run_id=None):
+        """
+        :param path: SQLite database file, created if missing
+        :param run_id: Id the rows of this process are tagged with
+        """
+        self.path = path
+        self.run_id = run_id or new_run_id()
+        self._lock = threading.Lock()
+        # parallel workers write to the same file, let them wait for locks
+        self._conn = sqlite3.connect(path, timeout=30,
+                                     check_same_thread=False)
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def record(self, resource_type, resource_id, from_status, to_status,
+               started_at, observed_at, image_ref=None, flavor_ref=None):
+        """Adds a transition observed at `observed_at`"""
+        row = (self.run_id, resource_type, str(resource_id), from_status,
+               to_status, started_at, observed_at, observed_at - started_at,
+               image_ref, flavor_ref)
+        with self._lock:
+            self._conn.execute('INSERT INTO transitions VALUES '
+                               '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', row)
+            self._conn.commit()
+
+    def durations(self, resource_type, from_status, to_status, since=None,
+                  run_id=None, image_ref=None, flavor_ref=None):
+        """
+        Returns (observed_at, duration) of the matching transitions, oldest
+        first. Filters left as None are not applied.
+        """
+        query = ('SELECT observed_at, duration FROM transitions WHERE '
+                 'resource_type = ? AND from_status = ? AND to_status = ?')
+        args = [resource_type, from_status, to_status]
+        for column, value in (('observed_at >=', since),
+                              ('run_id =', run_id),
+                              ('image_ref =', image_ref),
+                              ('flavor_ref =', flavor_ref)):
+            if value is not None:
+                query += ' AND %s ?' % column
+                args.append(value)
+        query += ' ORDER BY observed_at'
+        with self._lock:
+            return self._conn.execute(query, args).fetchall()
+
+    def trend(self, resource_type, from_status, to_status, days=28,
+              **filters):
+        """
+        Returns (day, count, p50, p95) of a transition for each UTC day of
+        the last `days` days that has observations. Additional filters are
+        passed to durations().
+        """
+        since = time.time() - days * 86400
+        by_day = {}
+        for observed_at, duration in self.durations(
+                resource_type, from_status, to_status, since, **filters):
+            day = time.strftime('%Y-%m-%d', time.gmtime(observed_at))
+            by_day.setdefault(day, []).append(duration)
+        return [(day, len(values), percentile(values, 50),
+                 percentile(values, 95))
+                for day, values in sorted(by_day.items())]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class StatusObserver(object):
+
+    """
+    Follows the statuses a waiter sees for one resource and records each
+    change to the store. The first status seen only starts the clock, so
+    the duration of a transition is measured from the first observation
+    of the status it leaves. Without a store, nothing is recorded.
+    """
+
+    def __init__(self, store, resource_type, resource_id, image_ref=None,
+                 flavor_ref=None):
+        self.store = store
+        self.resource_type = resource_type
+        self.resource_id = resource_id
+        self.image_ref = image_ref
+        self.flavor_ref = flavor_ref
+        self.status = None
+        self.since = None
+
+    def observe(self, status, now=None):
+        """Notes that the resource was seen in `status`"""
+        if now is None:
+            now = time.time()
+        if status == self.status:
+            return
+        if self.status is not None and self.store is not None:
+            try:
+                self.store.record(self.resource_type, self.resource_id,
+                                  self.status, status, self.since, now,
+                                  self.image_ref, self.flavor_ref)
+            except sqlite3.Error:
+                LOG.exception("Failed to record the %s -> %s transition of "
+                              "%s %s" % (self.status, status,
+                                         self.resource_type,
+                                         self.resource_id))
+        self.status = status
+        self.since = now
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store(config):
+    """
+    Returns the process-wide TelemetryStore of the [compute]
+    telemetry_file option, or None if the option is not set
+    """
+    global _store
+    path = config.compute.telemetry_file
+    # replayed statuses come back without their original timing
+    if not path or config.http.cassette_mode == cassette.REPLAY:
+        return None
+    with _store_lock:
+        if _store is None or _store.path != path:
+            _store = TelemetryStore(path, config.compute.telemetry_run_id)
+        return _store
+
+
+def get_observer(config, resource_type, resource, image_ref=None,
+                 flavor_ref=None):
+    """
+    Returns a StatusObserver for a resource dict, recording to the store
+    of get_store(). The image and flavor of servers are taken from the
+    resource itself.
+    """
+    if image_ref is None and isinstance(resource.get('image'), dict):
+        image_ref = resource['image'].get('id')
+    if flavor_ref is None and isinstance(resource.get('flavor'), dict):
+        flavor_ref = resource['flavor'].get('id')
+    return StatusObserver(get_store(config), resource_type, resource['id'],
+                          image_ref, flavor_ref)
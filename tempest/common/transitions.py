@@ -0,0 +1,160 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Running statistics of how long status transitions take, and polling
+schedules derived from them.
+
+A transition is keyed by (resource type, from status, to status,
+variant), where the variant distinguishes e.g. servers of different
+flavors and images. Once a transition has been seen a few times, a
+waiter polls sparsely until the fastest expected completion, densely
+around the mean, and at the configured build_interval once the
+transition is overdue.
+"""
+
+import math
+import threading
+import time
+
+from tempest.common import cassette
+
+# observations needed before a transition's schedule adapts
+MIN_SAMPLES = 3
+
+
+class RunningStats(object):
+
+    """Count, mean and variance updated one value at a time (Welford)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        if self.count < 2:
+            return 0.0
+        return self._m2 / (self.count - 1)
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+
+class TransitionStats(object):
+
+    """Thread-safe RunningStats of transition durations by key"""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, duration):
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = RunningStats()
+            stats.add(duration)
+
+    def get(self, key):
+        """Returns (count, mean, stddev) of a transition, or None"""
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                return None
+            return stats.count, stats.mean, stats.stddev
+
+    def keys(self):
+        with self._lock:
+            return self._stats.keys()
+
+
+class PollSchedule(object):
+
+    """Polling intervals for one wait on a transition"""
+
+    def __init__(self, stats, key, interval, floor=1.0, adaptive=True,
+                 start=None):
+        """
+        :param stats: TransitionStats the duration is recorded in
+        :param key: (resource type, from status, to status, variant)
+        :param interval: Interval used until the transition has been
+                         observed MIN_SAMPLES times, and once overdue
+        :param floor: Shortest interval an adaptive schedule returns
+        :param adaptive: If False, always returns `interval`
+        :param start: Time the wait started, now by default
+        """
+        self.stats = stats
+        self.key = key
+        self.interval = interval
+        self.floor = floor
+        self.adaptive = adaptive
+        self.start = time.time() if start is None else start
+
+    def elapsed(self):
+        return time.time() - self.start
+
+    def next_interval(self):
+        """Returns how long to sleep before the next poll"""
+        summary = self.stats.get(self.key) if self.adaptive else None
+        if summary is None or summary[0] < MIN_SAMPLES:
+            return self.interval
+        count, mean, stddev = summary
+        elapsed = self.elapsed()
+        earliest = mean - 2 * stddev
+        if elapsed < earliest:
+            # halve the remaining distance to the expected window
+            return max(self.floor, (earliest - elapsed) / 2)
+        if elapsed <= mean + 3 * stddev:
+            return max(self.floor, min(self.interval, stddev / 2))
+        return self.interval
+
+    def finished(self):
+        """Records the time since the start of the wait as the duration"""
+        resource_type, from_status, to_status, variant = self.key
+        if from_status != to_status:
+            self.stats.record(self.key, self.elapsed())
+
+
+_stats = TransitionStats()
+
+
+def get_stats():
+    """Returns the process-wide transition statistics"""
+    return _stats
+
+
+def get_schedule(config, key, interval=None, start=None):
+    """
+    Returns a PollSchedule for `key` on the process-wide statistics,
+    adapting only if the compute.adaptive_polling option is set
+    """
+    if interval is None:
+        interval = config.compute.build_interval
+    # replayed statuses are already recorded, there is nothing to wait for
+    adaptive = (config.compute.adaptive_polling and
+                config.http.cassette_mode != cassette.REPLAY)
+    return PollSchedule(_stats, key, interval,
+                        config.compute.poll_interval_floor, adaptive, start)
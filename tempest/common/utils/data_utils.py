@@ -1,11 +1,39 @@
+import hashlib
 import random
 import re
+import threading
 import urllib
 from tempest import exceptions
 
+_name_seed = None
+_name_randoms = {}
+_name_lock = threading.Lock()
+
+
+def seed_names(seed):
+    """
+    Makes rand_name deterministic: after seed_names(seed), the n-th name
+    generated with a given prefix is the same in every run with that seed.
+    A seed of None restores random names.
+    """
+    global _name_seed
+    with _name_lock:
+        _name_seed = seed
+        _name_randoms.clear()
+
 
 def rand_name(name='test'):
-    return name + str(random.randint(1, 99999999999))
+    with _name_lock:
+        if _name_seed is None:
+            return name + str(random.randint(1, 99999999999))
+        # One generator per prefix, so that names with other prefixes
+        # generated in between do not shift the sequence
+        generator = _name_randoms.get(name)
+        if generator is None:
+            digest = hashlib.md5('%s:%s' % (_name_seed, name)).hexdigest()
+            generator = random.Random(int(digest, 16))
+            _name_randoms[name] = generator
+        return name + str(generator.randint(1, 99999999999))
 
 
 def build_url(host, port, api_version=None, path=None,
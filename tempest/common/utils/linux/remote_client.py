@@ -5,10 +5,11 @@ from tempest.exceptions import SSHTimeout, ServerUnreachable
 
 class RemoteClient():
 
-    def __init__(self, server, username, password):
+    def __init__(self, server, username, password, console_client=None):
         ssh_timeout = TempestConfig().compute.ssh_timeout
         network = TempestConfig().compute.network_for_ssh
         ip_version = TempestConfig().compute.ip_version_for_ssh
+        wait_for_boot = TempestConfig().compute.wait_for_console_boot
         addresses = server['addresses'][network]
 
         for address in addresses:
@@ -19,6 +20,10 @@ class RemoteClient():
         if ip_address is None:
             raise ServerUnreachable()
 
+        if console_client is not None and wait_for_boot:
+            # do not retry SSH while the instance is still booting
+            console_client.wait_for_boot(server['id'])
+
         self.ssh_client = Client(ip_address, username, password, ssh_timeout)
         if not self.ssh_client.test_connection_auth():
             raise SSHTimeout()
@@ -19,6 +19,7 @@ import ConfigParser
 import logging
 import os
 
+from tempest.common import cassette
 from tempest.common.utils import data_utils
 
 LOG = logging.getLogger(__name__)
@@ -114,6 +115,10 @@ class ComputeConfig(BaseConfig):
 
     SECTION_NAME = "compute"
 
+    def __init__(self, conf):
+        super(ComputeConfig, self).__init__(conf)
+        self._replaying = HttpConfig(conf).cassette_mode == cassette.REPLAY
+
     @property
     def allow_tenant_isolation(self):
         """
@@ -124,6 +129,15 @@ class ComputeConfig(BaseConfig):
         """
         return self.get("allow_tenant_isolation", 'false').lower() != 'false'
 
+    @property
+    def credential_pool_size(self):
+        """
+        Number of isolated tenant/user pairs created when the first test
+        class starts and shared by all of them. 0 creates and deletes a
+        pair for every class.
+        """
+        return int(self.get("credential_pool_size", 0))
+
     @property
     def username(self):
         """Username to use for Nova API requests."""
@@ -187,6 +201,9 @@ class ComputeConfig(BaseConfig):
     @property
     def build_interval(self):
         """Time in seconds between build status checks."""
+        if self._replaying:
+            # Replayed statuses are already recorded, no need to wait
+            return 0.0
         return float(self.get("build_interval", 10))
 
     @property
@@ -194,6 +211,50 @@ class ComputeConfig(BaseConfig):
         """Timeout in seconds to wait for an entity to build."""
         return float(self.get("build_timeout", 300))
 
+    @property
+    def adaptive_polling(self):
+        """
+        Poll sparsely early and densely near the expected completion of
+        transitions whose duration has been observed before.
+        """
+        return self.get("adaptive_polling", 'false').lower() != 'false'
+
+    @property
+    def poll_interval_floor(self):
+        """Shortest interval in seconds between adaptive status checks."""
+        return float(self.get("poll_interval_floor", 1))
+
+    @property
+    def batched_status_polling(self):
+        """
+        Wait for servers, volumes and images to reach a status with one
+        detailed listing per build_interval for all outstanding waits.
+        """
+        return self.get("batched_status_polling", 'false').lower() != 'false'
+
+    @property
+    def server_pool_size(self):
+        """
+        Number of ACTIVE servers kept booted ahead of the tests that lease
+        them. 0 boots a server for every lease.
+        """
+        return int(self.get("server_pool_size", 0))
+
+    @property
+    def telemetry_file(self):
+        """SQLite database the status transitions seen are recorded in."""
+        return self.get("telemetry_file")
+
+    @property
+    def telemetry_run_id(self):
+        """Id of this run in telemetry_file, generated if not set."""
+        return self.get("telemetry_run_id")
+
+    @property
+    def bulk_create_concurrency(self):
+        """Maximum number of concurrent create requests in create_servers."""
+        return int(self.get("bulk_create_concurrency", 5))
+
     @property
     def run_ssh(self):
         """Does the test environment support snapshots?"""
@@ -209,6 +270,22 @@ class ComputeConfig(BaseConfig):
         """Timeout in seconds to wait for authentcation to succeed."""
         return float(self.get("ssh_timeout", 300))
 
+    @property
+    def boot_markers(self):
+        """
+        Regular expressions, one per line, matching console log lines
+        written once an instance has booted.
+        """
+        markers = self.get("boot_markers",
+                           "(?i)cloud-init.* finished\nlogin:\\s*$")
+        return [marker.strip() for marker in markers.splitlines()
+                if marker.strip()]
+
+    @property
+    def wait_for_console_boot(self):
+        """Wait for a boot marker in the console log before using SSH?"""
+        return self.get("wait_for_console_boot", 'false').lower() != 'false'
+
     @property
     def network_for_ssh(self):
         """Network used for SSH connections."""
@@ -219,6 +296,14 @@ class ComputeConfig(BaseConfig):
         """IP version used for SSH connections."""
         return int(self.get("ip_version_for_ssh", 4))
 
+    @property
+    def client_rate_limiting(self):
+        """
+        Pace requests according to the rate limits advertised by the
+        Compute API instead of sleeping after being rate limited.
+        """
+        return self.get("client_rate_limiting", 'true').lower() != 'false'
+
     @property
     def catalog_type(self):
         """Catalog type of the Compute service."""
@@ -308,6 +393,68 @@ class NetworkConfig(BaseConfig):
         return self.get("api_version", "v1.1")
 
 
+class HttpConfig(BaseConfig):
+    """Provides configuration for the HTTP transport used by all clients."""
+
+    SECTION_NAME = "http"
+
+    @property
+    def pool_size(self):
+        """Maximum number of idle keep-alive connections kept per host."""
+        return int(self.get("pool_size", 10))
+
+    @property
+    def pool_idle_timeout(self):
+        """Time in seconds after which an idle connection is closed."""
+        return float(self.get("pool_idle_timeout", 60))
+
+    @property
+    def async_workers(self):
+        """Maximum number of concurrent requests issued by an AsyncManager."""
+        return int(self.get("async_workers", 50))
+
+    @property
+    def timeout(self):
+        """Socket timeout in seconds for HTTP requests (none if unset)."""
+        timeout = self.get("timeout")
+        return float(timeout) if timeout else None
+
+    @property
+    def retry_max_retries(self):
+        """Number of times a request that failed transiently is retried."""
+        return int(self.get("retry_max_retries", 3))
+
+    @property
+    def retry_base_delay(self):
+        """Upper bound in seconds of the delay before the first retry."""
+        return float(self.get("retry_base_delay", 0.5))
+
+    @property
+    def retry_max_delay(self):
+        """Cap in seconds on the exponentially growing retry delay."""
+        return float(self.get("retry_max_delay", 30))
+
+    @property
+    def retry_budget(self):
+        """Maximum number of retries spent during a single test."""
+        return int(self.get("retry_budget", 10))
+
+    @property
+    def cassette_mode(self):
+        """'record' or 'replay' the HTTP traffic to/from cassette_file."""
+        return self.get("cassette_mode")
+
+    @property
+    def cassette_file(self):
+        """File the HTTP traffic is recorded to or replayed from."""
+        return self.get("cassette_file", "tempest.cassette")
+
+    @property
+    def metrics_file(self):
+        """File the per-endpoint request metrics are written to at exit."""
+        return self.get("metrics_file")
+
+
 # TODO(jaypipes): Move this to a common utils (not data_utils...)
 def singleton(cls):
     """Simple wrapper for classes that should only have a single instance"""
@@ -349,6 +496,7 @@ class TempestConfig:
             msg = "Config file %(path)s not found" % locals()
             raise RuntimeError(msg)
 
+        self.path = path
         self._conf = self.load_config(path)
         self.compute = ComputeConfig(self._conf)
         self.compute_admin = ComputeAdminConfig(self._conf)
@@ -356,6 +504,7 @@ class TempestConfig:
         self.identity_admin = IdentityAdminConfig(self._conf)
         self.images = ImagesConfig(self._conf)
         self.network = NetworkConfig(self._conf)
+        self.http = HttpConfig(self._conf)
 
     def load_config(self, path):
         """Read configuration from given path and return a config object."""
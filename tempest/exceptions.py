@@ -96,3 +96,11 @@ class SSHTimeout(TempestException):
 
 class ServerUnreachable(TempestException):
     message = "The server is not reachable via the configured network"
+
+
+class CassetteMismatch(TempestException):
+    message = "No recorded response left for %(method)s %(url)s"
+
+
+class WaitCancelled(TempestException):
+    message = "The wait for %(kind)s %(resource_id)s was cancelled"
@@ -19,6 +19,8 @@ import logging
 
 from tempest import config
 from tempest import exceptions
+from tempest.common.async_client import AsyncClient
+from tempest.common.futures import WorkerPool
 from tempest.services.image import service as image_service
 from tempest.services.network.json.network_client import NetworkClient
 from tempest.services.nova.json.images_client import ImagesClient
@@ -116,6 +118,33 @@ class AdminManager(Manager):
                                            conf.compute_admin.tenant_name)
 
 
+class AsyncManager(object):
+
+    """
+    Manager object whose clients return Futures instead of blocking.
+    All of them issue their requests from one bounded WorkerPool, so many
+    calls can be in flight without a thread per request.
+    """
+
+    def __init__(self, manager=None, workers=None):
+        """
+        :param manager: Manager whose clients are wrapped. A default
+                        Manager is created if none is given.
+        :param workers: Maximum number of concurrent requests. Defaults to
+                        the [http] async_workers configuration option.
+        """
+        self.manager = manager or Manager()
+        self.config = self.manager.config
+        self.pool = WorkerPool(workers or self.config.http.async_workers)
+        for name, client in vars(self.manager).items():
+            if name.endswith('_client'):
+                setattr(self, name, AsyncClient(client, self.pool))
+
+    def shutdown(self, wait=True):
+        """Stops the worker threads once queued calls have completed"""
+        self.pool.shutdown(wait)
+
+
 class ServiceManager(object):
 
     """
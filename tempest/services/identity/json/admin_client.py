@@ -1,6 +1,7 @@
+from tempest.common import cassette
+from tempest.common import metrics
 from tempest.common.rest_client import RestClient
 from tempest import exceptions
-import httplib2
 import json
 
 
@@ -166,6 +167,8 @@ class TokenClient(RestClient):
 
     def __init__(self, config):
         self.auth_url = config.identity.auth_url
+        self.http_obj = cassette.get_transport(config)
+        self.metrics = metrics.get_registry(config)
 
     def auth(self, user, password, tenant):
         creds = {'auth': {
@@ -183,12 +186,11 @@ class TokenClient(RestClient):
 
     def request(self, method, url, headers=None, body=None):
         """A simple HTTP request interface."""
-        self.http_obj = httplib2.Http()
         if headers == None:
             headers = {}
 
-        resp, resp_body = self.http_obj.request(url, method,
-                                                headers=headers, body=body)
+        resp, resp_body = self._http_request(url, method,
+                                             headers=headers, body=body)
 
         if resp.status in (401, 403):
             resp_body = json.loads(resp_body)
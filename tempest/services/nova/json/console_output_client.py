@@ -1,5 +1,9 @@
+from tempest import exceptions
+from tempest.common.console import ConsoleTail
 from tempest.common.rest_client import RestClient
 import json
+import re
+import time
 
 
 class ConsoleOutputsClient(RestClient):
@@ -8,6 +12,8 @@ class ConsoleOutputsClient(RestClient):
         super(ConsoleOutputsClient, self).__init__(config, username, password,
                                              auth_url, tenant_name)
         self.service = self.config.compute.catalog_type
+        self.build_interval = self.config.compute.build_interval
+        self.build_timeout = self.config.compute.build_timeout
 
     def get_console_output(self, server_id, length):
         post_body = {'os-getConsoleOutput': {'length': length}}
@@ -16,3 +22,36 @@ class ConsoleOutputsClient(RestClient):
         resp, body = self.post(url, post_body, self.headers)
         body = json.loads(body)
         return resp, body['output']
+
+    def wait_for_boot(self, server_id, markers=None, timeout=None):
+        """
+        Waits for a line of the console log of a server to match one of the
+        regular expressions in `markers`, by default the boot_markers
+        option, and returns the line. Only the lines written since the
+        previous poll are fetched.
+        """
+        if markers is None:
+            markers = self.config.compute.boot_markers
+        if timeout is None:
+            timeout = self.build_timeout
+        patterns = [re.compile(marker) for marker in markers]
+        tail = ConsoleTail(self, server_id)
+        start = time.time()
+
+        while True:
+            try:
+                lines = tail.poll()
+            except exceptions.Duplicate:
+                # the instance is not ready to give its log yet
+                lines = []
+            for line in lines + [tail.partial]:
+                for pattern in patterns:
+                    if pattern.search(line):
+                        return line
+
+            if time.time() - start >= timeout:
+                message = ('Server %s did not log any of %s within the '
+                           'required time (%s s).' %
+                           (server_id, ', '.join(markers), timeout))
+                raise exceptions.TimeoutException(message)
+            time.sleep(self.build_interval)
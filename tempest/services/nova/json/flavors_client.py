@@ -35,6 +35,13 @@ class FlavorsClient(RestClient):
         body = json.loads(body)
         return resp, body['flavors']
 
+    def iter_flavors_with_detail(self, params=None, page_size=None):
+        """
+        Returns a generator over the detailed flavors, fetched lazily one
+        page at a time
+        """
+        return self.paginate('flavors/detail', 'flavors', params, page_size)
+
     def get_flavor_details(self, flavor_id):
         resp, body = self.get("flavors/%s" % str(flavor_id))
         body = json.loads(body)
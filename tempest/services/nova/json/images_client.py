@@ -1,3 +1,6 @@
+from tempest.common import telemetry
+from tempest.common import transitions
+from tempest.common.poller import StatusPoller
 from tempest.common.rest_client import RestClient
 from tempest import exceptions
 import json
@@ -12,6 +15,22 @@ class ImagesClient(RestClient):
         self.service = self.config.compute.catalog_type
         self.build_interval = self.config.compute.build_interval
         self.build_timeout = self.config.compute.build_timeout
+        self.status_poller = StatusPoller(
+            lambda: self.list_images_with_detail()[1],
+            lambda image_id: self.get_image(image_id)[1],
+            self.build_interval, self.build_timeout, 'ERROR',
+            lambda image_id: exceptions.AddImageException(image_id=image_id),
+            'Image', self._status_schedule, self._status_observer)
+
+    def _status_schedule(self, image, status, start=None):
+        """Returns the PollSchedule of a wait for `image` to reach status"""
+        key = ('image', image['status'], status, None)
+        return transitions.get_schedule(self.config, key,
+                                        self.build_interval, start)
+
+    def _status_observer(self, image):
+        """Returns the StatusObserver recording the statuses of `image`"""
+        return telemetry.get_observer(self.config, 'image', image)
 
     def create_image(self, server_id, name, meta=None):
         """Creates an image of the original server"""
@@ -58,6 +77,13 @@ class ImagesClient(RestClient):
         body = json.loads(body)
         return resp, body['images']
 
+    def iter_images_with_detail(self, params=None, page_size=None):
+        """
+        Returns a generator over the detailed images filtered by any
+        parameters, fetched lazily one page at a time
+        """
+        return self.paginate('images/detail', 'images', params, page_size)
+
     def get_image(self, image_id):
         """Returns the details of a single image"""
         resp, body = self.get("images/%s" % str(image_id))
@@ -85,12 +111,20 @@ class ImagesClient(RestClient):
 
     def wait_for_image_status(self, image_id, status):
         """Waits for an image to reach a given status."""
+        if self.config.compute.batched_status_polling:
+            self.status_poller.watch(image_id, status).result()
+            return
+
         resp, image = self.get_image(image_id)
         start = int(time.time())
+        schedule = self._status_schedule(image, status)
+        observer = self._status_observer(image)
+        observer.observe(image['status'])
 
         while image['status'] != status:
-            time.sleep(self.build_interval)
+            time.sleep(schedule.next_interval())
             resp, image = self.get_image(image_id)
+            observer.observe(image['status'])
 
             if image['status'] == 'ERROR':
                 raise exceptions.AddImageException(image_id=image_id)
@@ -98,6 +132,20 @@ class ImagesClient(RestClient):
             if int(time.time()) - start >= self.build_timeout:
                 raise exceptions.TimeoutException
 
+        schedule.finished()
+
+    def watch_images_status(self, image_ids, status):
+        """
+        Returns a Future per image resolved with its details once it
+        reaches `status`, either a single status or a list with one per
+        image. Use futures.wait_all, wait_any or as_completed to wait.
+        """
+        return self.status_poller.watch_all(image_ids, status)
+
+    def wait_for_images_status(self, image_ids, status):
+        """Waits for all of the given images to reach a given status"""
+        self.status_poller.wait(image_ids, status)
+
     def list_image_metadata(self, image_id):
         """Lists all metadata items for an image"""
         resp, body = self.get("images/%s/metadata" % str(image_id))
@@ -1,4 +1,5 @@
 import json
+from tempest.common import rate_limiter
 from tempest.common.rest_client import RestClient
 
 
@@ -12,6 +13,9 @@ class LimitsClient(RestClient):
     def get_limits(self):
         resp, body = self.get("limits")
         body = json.loads(body)
+        # Keep the client-side rate limiter in step with the endpoint
+        rate_limiter.get_limiter(self.base_url).learn(
+            body['limits'].get('rate', []))
         return resp, body['limits']
 
     def get_max_server_meta(self):
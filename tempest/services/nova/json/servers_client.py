@@ -1,5 +1,10 @@
 from tempest import exceptions
+from tempest.common import telemetry
+from tempest.common import transitions
+from tempest.common.futures import WorkerPool
+from tempest.common.poller import StatusPoller
 from tempest.common.rest_client import RestClient
+from tempest.common.state_tracker import ServerStateTracker
 import json
 import time
 
@@ -10,6 +15,30 @@ class ServersClient(RestClient):
         super(ServersClient, self).__init__(config, username, password,
                                            auth_url, tenant_name)
         self.service = self.config.compute.catalog_type
+        self.state_tracker = ServerStateTracker(self)
+        self.status_poller = StatusPoller(
+            self._list_tracked_servers,
+            lambda server_id: self.get_server(server_id)[1],
+            self.build_interval, self.build_timeout, 'ERROR',
+            lambda server_id: exceptions.BuildErrorException(
+                server_id=server_id),
+            'Server', self._status_schedule, self._status_observer)
+
+    def _status_schedule(self, server, status, start=None):
+        """Returns the PollSchedule of a wait for `server` to reach status"""
+        variant = (server.get('flavor', {}).get('id'),
+                   server.get('image', {}).get('id'))
+        key = ('server', server['status'], status, variant)
+        return transitions.get_schedule(self.config, key,
+                                        self.build_interval, start)
+
+    def _status_observer(self, server):
+        """Returns the StatusObserver recording the statuses of `server`"""
+        return telemetry.get_observer(self.config, 'server', server)
+
+    def _list_tracked_servers(self):
+        self.state_tracker.refresh()
+        return self.state_tracker.list()
 
     def create_server(self, name, image_ref, flavor_ref, **kwargs):
         """
@@ -33,6 +62,15 @@ class ServersClient(RestClient):
         max_count: Count of maximum number of instances to launch.
         disk_config: Determines if user or admin controls disk configuration.
         """
+        post_body = self._create_server_body(name, image_ref, flavor_ref,
+                                             **kwargs)
+        post_body = json.dumps({'server': post_body})
+        resp, body = self.post('servers', post_body, self.headers)
+
+        body = json.loads(body)
+        return resp, body['server']
+
+    def _create_server_body(self, name, image_ref, flavor_ref, **kwargs):
         post_body = {
             'name': name,
             'imageRef': image_ref,
@@ -53,11 +91,54 @@ class ServersClient(RestClient):
             value = kwargs.get(key)
             if value != None:
                 post_body[post_param] = value
+        return post_body
+
+    def _create_server_from_spec(self, spec):
+        spec = dict(spec)
+        name = spec.pop('name')
+        image_ref = spec.pop('image_ref')
+        flavor_ref = spec.pop('flavor_ref')
+        return self.create_server(name, image_ref, flavor_ref, **spec)
+
+    def create_servers(self, specs, concurrency=None):
+        """
+        Creates several servers, keeping at most `concurrency` create
+        requests in flight at once.
+        specs (Required): A list of dicts, each holding the name, image_ref
+        and flavor_ref of a server plus any optional keyword argument
+        accepted by create_server.
+        concurrency: Defaults to the bulk_create_concurrency option.
+        Returns a list of Futures, one per spec and in the same order, each
+        resolving to the (resp, server) tuple returned by create_server.
+        """
+        if concurrency is None:
+            concurrency = self.config.compute.bulk_create_concurrency
+        pool = WorkerPool(max(1, min(concurrency, len(specs))))
+        futures = [pool.submit(self._create_server_from_spec, spec)
+                   for spec in specs]
+        # Workers exit once the queued requests have been issued
+        pool.shutdown(wait=False)
+        return futures
+
+    def create_multiple_servers(self, name, image_ref, flavor_ref, count,
+                                **kwargs):
+        """
+        Boots `count` identical servers with a single multi-create request
+        (min_count = max_count = count). Accepts the same optional keyword
+        arguments as create_server and returns the created servers.
+        """
+        kwargs['min_count'] = count
+        kwargs['max_count'] = count
+        post_body = self._create_server_body(name, image_ref, flavor_ref,
+                                             **kwargs)
+        post_body['return_reservation_id'] = True
         post_body = json.dumps({'server': post_body})
         resp, body = self.post('servers', post_body, self.headers)
 
         body = json.loads(body)
-        return resp, body['server']
+        params = {'reservation_id': body['reservation_id']}
+        _, listing = self.list_servers_with_detail(params)
+        return resp, listing['servers']
 
     def update_server(self, server_id, name=None, meta=None, accessIPv4=None,
                       accessIPv6=None):
@@ -130,16 +211,31 @@ class ServersClient(RestClient):
         body = json.loads(body)
         return resp, body
 
+    def iter_servers_with_detail(self, params=None, page_size=None):
+        """
+        Returns a generator over the detailed servers of a user, fetched
+        lazily one page at a time
+        """
+        return self.paginate('servers/detail', 'servers', params, page_size)
+
     def wait_for_server_status(self, server_id, status):
         """Waits for a server to reach a given status"""
+        if self.config.compute.batched_status_polling:
+            self.status_poller.watch(server_id, status).result()
+            return
+
         resp, body = self.get_server(server_id)
         server_status = body['status']
         start = int(time.time())
+        schedule = self._status_schedule(body, status)
+        observer = self._status_observer(body)
+        observer.observe(server_status)
 
         while(server_status != status):
-            time.sleep(self.build_interval)
+            time.sleep(schedule.next_interval())
             resp, body = self.get_server(server_id)
             server_status = body['status']
+            observer.observe(server_status)
 
             if server_status == 'ERROR':
                 raise exceptions.BuildErrorException(server_id=server_id)
@@ -153,16 +249,39 @@ class ServersClient(RestClient):
                 message += ' Current status: %s.' % server_status
                 raise exceptions.TimeoutException(message)
 
+        schedule.finished()
+
+    def watch_servers_status(self, server_ids, status):
+        """
+        Returns a Future per server resolved with its details once it
+        reaches `status`, either a single status or a list with one per
+        server. Use futures.wait_all, wait_any or as_completed to wait.
+        """
+        return self.status_poller.watch_all(server_ids, status)
+
+    def wait_for_servers_status(self, server_ids, status):
+        """
+        Waits for all of the given servers to reach a given status, polling
+        them together with one detailed server listing per interval
+        """
+        self.status_poller.wait(server_ids, status)
+
     def wait_for_server_termination(self, server_id):
         """Waits for server to reach termination"""
         start_time = int(time.time())
+        observer = None
         while True:
             try:
                 resp, body = self.get_server(server_id)
             except exceptions.NotFound:
+                if observer is not None:
+                    observer.observe('DELETED')
                 return
 
             server_status = body['status']
+            if observer is None:
+                observer = self._status_observer(body)
+            observer.observe(server_status)
             if server_status == 'ERROR':
                 raise exceptions.BuildErrorException
 
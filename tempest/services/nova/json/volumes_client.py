@@ -1,4 +1,7 @@
 from tempest import exceptions
+from tempest.common import telemetry
+from tempest.common import transitions
+from tempest.common.poller import StatusPoller
 from tempest.common.rest_client import RestClient
 import json
 import time
@@ -12,6 +15,23 @@ class VolumesClient(RestClient):
         self.service = self.config.compute.catalog_type
         self.build_interval = self.config.compute.build_interval
         self.build_timeout = self.config.compute.build_timeout
+        self.status_poller = StatusPoller(
+            lambda: self.list_volumes_with_detail()[1],
+            lambda volume_id: self.get_volume(volume_id)[1],
+            self.build_interval, self.build_timeout, 'error',
+            lambda volume_id: exceptions.VolumeBuildErrorException(
+                volume_id=volume_id),
+            'Volume', self._status_schedule, self._status_observer)
+
+    def _status_schedule(self, volume, status, start=None):
+        """Returns the PollSchedule of a wait for `volume` to reach status"""
+        key = ('volume', volume['status'], status, volume.get('size'))
+        return transitions.get_schedule(self.config, key,
+                                        self.build_interval, start)
+
+    def _status_observer(self, volume):
+        """Returns the StatusObserver recording the statuses of `volume`"""
+        return telemetry.get_observer(self.config, 'volume', volume)
 
     def list_volumes(self, params=None):
         """List all the volumes created"""
@@ -41,6 +61,14 @@ class VolumesClient(RestClient):
         body = json.loads(body)
         return resp, body['volumes']
 
+    def iter_volumes_with_detail(self, params=None, page_size=None):
+        """
+        Returns a generator over the details of volumes, fetched lazily one
+        page at a time
+        """
+        return self.paginate('os-volumes/detail', 'volumes', params,
+                             page_size)
+
     def get_volume(self, volume_id):
         """Returns the details of a single volume"""
         url = "os-volumes/%s" % str(volume_id)
@@ -73,15 +101,23 @@ class VolumesClient(RestClient):
 
     def wait_for_volume_status(self, volume_id, status):
         """Waits for a Volume to reach a given status"""
+        if self.config.compute.batched_status_polling:
+            self.status_poller.watch(volume_id, status).result()
+            return
+
         resp, body = self.get_volume(volume_id)
         volume_name = body['displayName']
         volume_status = body['status']
         start = int(time.time())
+        schedule = self._status_schedule(body, status)
+        observer = self._status_observer(body)
+        observer.observe(volume_status)
 
         while volume_status != status:
-            time.sleep(self.build_interval)
+            time.sleep(schedule.next_interval())
             resp, body = self.get_volume(volume_id)
             volume_status = body['status']
+            observer.observe(volume_status)
             if volume_status == 'error':
                 raise exceptions.VolumeBuildErrorException(volume_id=volume_id)
 
@@ -91,6 +127,20 @@ class VolumesClient(RestClient):
                                               self.build_timeout)
                 raise exceptions.TimeoutException(message)
 
+        schedule.finished()
+
+    def watch_volumes_status(self, volume_ids, status):
+        """
+        Returns a Future per volume resolved with its details once it
+        reaches `status`, either a single status or a list with one per
+        volume. Use futures.wait_all, wait_any or as_completed to wait.
+        """
+        return self.status_poller.watch_all(volume_ids, status)
+
+    def wait_for_volumes_status(self, volume_ids, status):
+        """Waits for all of the given volumes to reach a given status"""
+        self.status_poller.wait(volume_ids, status)
+
     def is_resource_deleted(self, id):
         try:
             self.get_volume(id)
@@ -0,0 +1,9 @@
+
+from tempest import config
+from tempest.common import cassette
+
+# Open the cassette before the test modules are imported, as some of them
+# generate names at import time and those must be seeded from it
+CONFIG = config.TempestConfig()
+if CONFIG.http.cassette_mode:
+    cassette.get_transport(CONFIG)
@@ -23,13 +23,16 @@ import unittest2 as unittest
 from tempest import config
 from tempest import exceptions
 from tempest import openstack
+from tempest.common import cred_pool
+from tempest.common import retry
+from tempest.common import server_pool
 from tempest.common.utils.data_utils import rand_name
 from tempest.services.identity.json.admin_client import AdminClient
 
 LOG = logging.getLogger(__name__)
 
 
-class BaseComputeTest(unittest.TestCase):
+class BaseComputeTest(retry.RetryBudgetMixin, unittest.TestCase):
 
     """Base test case class for all Compute API tests"""
 
@@ -37,6 +40,7 @@ class BaseComputeTest(unittest.TestCase):
     def setUpClass(cls):
         cls.config = config.TempestConfig()
         cls.isolated_creds = []
+        cls.pooled_creds = []
 
         if cls.config.compute.allow_tenant_isolation:
             creds = cls._get_isolated_creds()
@@ -87,6 +91,14 @@ class BaseComputeTest(unittest.TestCase):
         **regular** user of the Compute API so that a test case can
         operate in an isolated tenant container.
         """
+        pool = cred_pool.get_pool(cls.config, cls._get_identity_admin_client,
+                                  openstack.Manager)
+        if pool is not None:
+            creds = pool.lease()
+            cls.isolated_creds.append((creds.user, creds.tenant))
+            cls.pooled_creds.append(creds)
+            return creds.username, creds.tenant_name, creds.password
+
         admin_client = cls._get_identity_admin_client()
         rand_name_root = cls.__name__
         if cls.isolated_creds:
@@ -113,6 +125,14 @@ class BaseComputeTest(unittest.TestCase):
 
     @classmethod
     def clear_isolated_creds(cls):
+        if cls.pooled_creds:
+            pool = cred_pool.get_pool(cls.config,
+                                      cls._get_identity_admin_client,
+                                      openstack.Manager)
+            for creds in cls.pooled_creds:
+                pool.release(creds)
+            cls.pooled_creds = []
+            return
         if not cls.isolated_creds:
             pass
         admin_client = cls._get_identity_admin_client()
@@ -123,6 +143,9 @@ class BaseComputeTest(unittest.TestCase):
 
     @classmethod
     def tearDownClass(cls):
+        if cls.isolated_creds:
+            # the pooled servers of the class' tenant go with it
+            server_pool.close_pools(cls.servers_client)
         cls.clear_isolated_creds()
 
     def create_server(self, image_id=None):
@@ -138,6 +161,28 @@ class BaseComputeTest(unittest.TestCase):
         self.servers.append(server)
         return server
 
+    def lease_server(self, rebuild=True):
+        """
+        Returns an ACTIVE server of image_ref and flavor_ref for the rest of
+        the test. With server_pool_size set, the server comes from the
+        pool and goes back to it after the test, rebuilt unless `rebuild`
+        is False; otherwise it is booted now and deleted after the test.
+        """
+        if not self.config.compute.server_pool_size:
+            server_name = rand_name(self.__class__.__name__ + "-instance")
+            resp, server = self.servers_client.create_server(
+                                server_name, self.image_ref, self.flavor_ref)
+            self.addCleanup(self.servers_client.delete_server, server['id'])
+            self.servers_client.wait_for_server_status(server['id'],
+                                                       'ACTIVE')
+            return server
+
+        pool = server_pool.get_pool(self.servers_client, self.image_ref,
+                                    self.flavor_ref)
+        server = pool.lease()
+        self.addCleanup(pool.release, server, rebuild)
+        return server
+
     def wait_for(self, condition):
         """Repeatedly calls condition() until a timeout"""
         start_time = int(time.time())
@@ -154,7 +199,7 @@ class BaseComputeTest(unittest.TestCase):
             time.sleep(self.build_interval)
 
 
-class BaseComputeAdminTest(unittest.TestCase):
+class BaseComputeAdminTest(retry.RetryBudgetMixin, unittest.TestCase):
 
     """Base test case class for all Compute Admin API tests"""
 
@@ -87,7 +87,8 @@ class TestAttachVolume(BaseComputeTest):
             self.servers_client.wait_for_server_status(server['id'], 'ACTIVE')
 
             linux_client = RemoteClient(server,
-                                        self.ssh_user, server['adminPass'])
+                                        self.ssh_user, server['adminPass'],
+                                        self.console_outputs_client)
             partitions = linux_client.get_partitions()
             self.assertTrue(self.device in partitions)
 
@@ -101,7 +102,8 @@ class TestAttachVolume(BaseComputeTest):
             self.servers_client.wait_for_server_status(server['id'], 'ACTIVE')
 
             linux_client = RemoteClient(server,
-                                        self.ssh_user, server['adminPass'])
+                                        self.ssh_user, server['adminPass'],
+                                        self.console_outputs_client)
             partitions = linux_client.get_partitions()
             self.assertFalse(self.device in partitions)
         finally:
@@ -53,6 +53,12 @@ class ConsoleOutputTest(BaseComputeTest):
             self.assertEqual(lines, 10)
         self.wait_for(get_output)
 
+    @attr(type='positive')
+    def test_wait_for_boot(self):
+        """The console log of an ACTIVE server shows a boot marker"""
+        line = self.client.wait_for_boot(self.server_id)
+        self.assertTrue(line)
+
     @attr(type='negative')
     def test_get_console_output_invalid_server_id(self):
         try:
@@ -95,7 +95,8 @@ class ServersTest(BaseComputeTest):
     @unittest.skipIf(not run_ssh, 'Instance validation tests are disabled.')
     def test_can_log_into_created_server(self):
         """Check that the user can authenticate with the generated password"""
-        linux_client = RemoteClient(self.server, self.ssh_user, self.password)
+        linux_client = RemoteClient(self.server, self.ssh_user, self.password,
+                                    self.console_outputs_client)
         self.assertTrue(linux_client.can_authenticate())
 
     @attr(type='positive')
@@ -106,12 +107,14 @@ class ServersTest(BaseComputeTest):
         the amount stated by the flavor
         """
         resp, flavor = self.flavors_client.get_flavor_details(self.flavor_ref)
-        linux_client = RemoteClient(self.server, self.ssh_user, self.password)
+        linux_client = RemoteClient(self.server, self.ssh_user, self.password,
+                                    self.console_outputs_client)
         self.assertEqual(flavor['vcpus'], linux_client.get_number_of_vcpus())
 
     @attr(type='positive')
     @unittest.skipIf(not run_ssh, 'Instance validation tests are disabled.')
     def test_host_name_is_same_as_server_name(self):
         """Verify the instance host name is the same as the server name"""
-        linux_client = RemoteClient(self.server, self.ssh_user, self.password)
+        linux_client = RemoteClient(self.server, self.ssh_user, self.password,
+                                    self.console_outputs_client)
         self.assertTrue(linux_client.hostname_equals_servername(self.name))
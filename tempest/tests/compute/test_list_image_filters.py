@@ -37,25 +37,28 @@ class ListImageFiltersTest(BaseComputeTest):
         resp, cls.server2 = cls.servers_client.create_server(name,
                                                              cls.image_ref,
                                                              cls.flavor_ref)
-        cls.servers_client.wait_for_server_status(cls.server1['id'], 'ACTIVE')
-        cls.servers_client.wait_for_server_status(cls.server2['id'], 'ACTIVE')
+        cls.servers_client.wait_for_servers_status([cls.server1['id'],
+                                                    cls.server2['id']],
+                                                   'ACTIVE')
 
         # Create images to be used in the filter tests
         image1_name = rand_name('image')
         resp, body = cls.client.create_image(cls.server1['id'], image1_name)
         cls.image1_id = parse_image_id(resp['location'])
-        cls.client.wait_for_image_resp_code(cls.image1_id, 200)
-        cls.client.wait_for_image_status(cls.image1_id, 'ACTIVE')
-        resp, cls.image1 = cls.client.get_image(cls.image1_id)
 
         # Servers have a hidden property for when they are being imaged
         # Performing back-to-back create image calls on a single
-        # server will sometimes cause failures
+        # server will sometimes cause failures, so the images of
+        # server1 are made one after the other
         image3_name = rand_name('image')
         resp, body = cls.client.create_image(cls.server2['id'], image3_name)
         cls.image3_id = parse_image_id(resp['location'])
+
+        cls.client.wait_for_image_resp_code(cls.image1_id, 200)
         cls.client.wait_for_image_resp_code(cls.image3_id, 200)
-        cls.client.wait_for_image_status(cls.image3_id, 'ACTIVE')
+        cls.client.wait_for_images_status([cls.image1_id, cls.image3_id],
+                                          'ACTIVE')
+        resp, cls.image1 = cls.client.get_image(cls.image1_id)
         resp, cls.image3 = cls.client.get_image(cls.image3_id)
 
         image2_name = rand_name('image')
@@ -58,20 +58,21 @@ class ListServerFiltersTest(BaseComputeTest):
                                cls.image_ref_alt)
 
         cls.s1_name = rand_name('server')
-        resp, cls.s1 = cls.client.create_server(cls.s1_name, cls.image_ref,
-                                                cls.flavor_ref)
         cls.s2_name = rand_name('server')
-        resp, cls.s2 = cls.client.create_server(cls.s2_name, cls.image_ref_alt,
-                                                cls.flavor_ref)
         cls.s3_name = rand_name('server')
-        resp, cls.s3 = cls.client.create_server(cls.s3_name, cls.image_ref,
-                                                cls.flavor_ref_alt)
-
-        cls.client.wait_for_server_status(cls.s1['id'], 'ACTIVE')
+        futures = cls.client.create_servers([
+            {'name': cls.s1_name, 'image_ref': cls.image_ref,
+             'flavor_ref': cls.flavor_ref},
+            {'name': cls.s2_name, 'image_ref': cls.image_ref_alt,
+             'flavor_ref': cls.flavor_ref},
+            {'name': cls.s3_name, 'image_ref': cls.image_ref,
+             'flavor_ref': cls.flavor_ref_alt}])
+        (_, cls.s1), (_, cls.s2), (_, cls.s3) = [f.result() for f in futures]
+
+        cls.client.wait_for_servers_status([cls.s1['id'], cls.s2['id'],
+                                            cls.s3['id']], 'ACTIVE')
         resp, cls.s1 = cls.client.get_server(cls.s1['id'])
-        cls.client.wait_for_server_status(cls.s2['id'], 'ACTIVE')
         resp, cls.s2 = cls.client.get_server(cls.s2['id'])
-        cls.client.wait_for_server_status(cls.s3['id'], 'ACTIVE')
         resp, cls.s3 = cls.client.get_server(cls.s3['id'])
 
         # The list server call returns minimal results, so we need
@@ -195,6 +196,17 @@ class ListServerFiltersTest(BaseComputeTest):
         resp, servers = self.client.list_servers_with_detail(params)
         self.assertEqual(1, len(servers['servers']))
 
+    @attr(type='positive')
+    def test_iter_servers_with_detail_walks_all_pages(self):
+        """Paging one server at a time should still yield every server"""
+        servers = list(self.client.iter_servers_with_detail(page_size=1))
+
+        self.assertTrue(self._server_id_in_results(self.s1['id'], servers))
+        self.assertTrue(self._server_id_in_results(self.s2['id'], servers))
+        self.assertTrue(self._server_id_in_results(self.s3['id'], servers))
+        ids = [server['id'] for server in servers]
+        self.assertEqual(len(ids), len(set(ids)))
+
     @classmethod
     def _convert_to_min_details(self, server):
         min_detail = {}
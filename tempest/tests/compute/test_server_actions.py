@@ -37,17 +37,10 @@ class ServerActionsTest(BaseComputeTest):
         cls.client = cls.servers_client
 
     def setUp(self):
-        self.name = rand_name('server')
-        resp, server = self.client.create_server(self.name,
-                                                 self.image_ref,
-                                                 self.flavor_ref)
+        # every test changes the server, it is rebuilt before reuse
+        server = self.lease_server()
         self.server_id = server['id']
 
-        self.client.wait_for_server_status(self.server_id, 'ACTIVE')
-
-    def tearDown(self):
-        self.client.delete_server(self.server_id)
-
     @attr(type='smoke')
     def test_change_server_password(self):
         """The server's password should be set to the provided password"""
@@ -48,6 +48,41 @@ class ServersTest(BaseComputeTest):
         finally:
             self.client.delete_server(server['id'])
 
+    @attr(type='positive')
+    def test_create_multiple_servers_in_one_request(self):
+        """A multi-create request should boot the requested number"""
+        servers = []
+        try:
+            name = rand_name('server')
+            resp, servers = self.client.create_multiple_servers(
+                                                        name, self.image_ref,
+                                                        self.flavor_ref, 2)
+            self.assertEqual(202, resp.status)
+            self.assertEqual(2, len(servers))
+            self.client.wait_for_servers_status(
+                [server['id'] for server in servers], 'ACTIVE')
+        finally:
+            for server in servers:
+                self.client.delete_server(server['id'])
+
+    @attr(type='positive')
+    def test_state_tracker_merges_changes(self):
+        """The server state tracker should pick up new and deleted servers"""
+        tracker = self.client.state_tracker
+        tracker.refresh()
+        name = rand_name('server')
+        resp, server = self.client.create_server(name, self.image_ref,
+                                                 self.flavor_ref)
+        try:
+            self.client.wait_for_server_status(server['id'], 'ACTIVE')
+            tracker.refresh()
+            self.assertEqual('ACTIVE', tracker.get(server['id'])['status'])
+        finally:
+            self.client.delete_server(server['id'])
+        self.client.wait_for_server_termination(server['id'])
+        tracker.refresh()
+        self.assertEqual(None, tracker.get(server['id']))
+
     def test_create_with_existing_server_name(self):
         """Creating a server with a name that already exists is allowed"""
 
@@ -19,6 +19,7 @@ import unittest2 as unittest
 
 import nose
 
+from tempest.common.futures import wait_all
 from tempest.common.utils.data_utils import rand_name
 from tempest.tests.compute.base import BaseComputeTest
 
@@ -39,36 +40,46 @@ class VolumesTest(BaseComputeTest):
     def setUpClass(cls):
         super(VolumesTest, cls).setUpClass()
         cls.client = cls.volumes_client
-        # Create 3 Volumes
+        # Create 3 Volumes and wait for them to become available together
         cls.volume_list = list()
         cls.volume_id_list = list()
-        for i in range(3):
-            v_name = rand_name('volume')
-            metadata = {'Type': 'work'}
-            try:
+        try:
+            for i in range(3):
+                v_name = rand_name('volume')
+                metadata = {'Type': 'work'}
                 resp, volume = cls.client.create_volume(size=1,
                                                          display_name=v_name,
                                                          metadata=metadata)
-                cls.client.wait_for_volume_status(volume['id'],
-                                                   'available')
-                resp, volume = cls.client.get_volume(volume['id'])
-                cls.volume_list.append(volume)
                 cls.volume_id_list.append(volume['id'])
-            except:
-                if cls.volume_list:
-                    # We could not create all the volumes, though we were able
-                    # to create *some* of the volumes. This is typically
-                    # because the backing file size of the volume group is
-                    # too small. So, here, we clean up whatever we did manage
-                    # to create and raise a SkipTest
-                    for volume in cls.volume_list:
-                        cls.client.delete_volume(volume)
-                    msg = ("Failed to create ALL necessary volumes to run "
-                           "test. This typically means that the backing file "
-                           "size of the nova-volumes group is too small to "
-                           "create the 3 volumes needed by this test case")
-                    raise nose.SkipTest(msg)
-                raise
+        except:
+            if cls.volume_id_list:
+                # We could not create all the volumes, though we were able
+                # to create *some* of the volumes. This is typically
+                # because the backing file size of the volume group is
+                # too small. So, here, we clean up whatever we did manage
+                # to create and raise a SkipTest
+                for volume_id in cls.volume_id_list:
+                    cls.client.delete_volume(volume_id)
+                msg = ("Failed to create ALL necessary volumes to run "
+                       "test. This typically means that the backing file "
+                       "size of the nova-volumes group is too small to "
+                       "create the 3 volumes needed by this test case")
+                raise nose.SkipTest(msg)
+            raise
+
+        futures = cls.client.watch_volumes_status(cls.volume_id_list,
+                                                  'available')
+        try:
+            wait_all(futures)
+        except:
+            # A volume failed to build, stop waiting for the others
+            cls.client.status_poller.cancel(futures)
+            for volume_id in cls.volume_id_list:
+                cls.client.delete_volume(volume_id)
+            raise
+        for volume_id in cls.volume_id_list:
+            resp, volume = cls.client.get_volume(volume_id)
+            cls.volume_list.append(volume)
 
     @classmethod
     def tearDownClass(cls):
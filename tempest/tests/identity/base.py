@@ -19,12 +19,13 @@ import nose
 import unittest2 as unittest
 
 import tempest.config
+from tempest.common import retry
 from tempest.common.utils.data_utils import rand_name
 from tempest.services.identity.json.admin_client import AdminClient
 from tempest.services.identity.json.admin_client import TokenClient
 
 
-class BaseIdentityAdminTest(unittest.TestCase):
+class BaseIdentityAdminTest(retry.RetryBudgetMixin, unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
@@ -20,10 +20,11 @@ import unittest2 as unittest
 
 from tempest import exceptions
 from tempest import openstack
+from tempest.common import retry
 from tempest.common.utils.data_utils import rand_name
 
 
-class BaseNetworkTest(unittest.TestCase):
+class BaseNetworkTest(retry.RetryBudgetMixin, unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
@@ -0,0 +1,98 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import ConfigParser
+import imp
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from nose.plugins.attrib import attr
+import unittest2 as unittest
+
+import tempest
+
+TOP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(tempest.__file__)))
+# Keypairs are named with rand_name and ListServerFiltersTest creates its
+# servers concurrently
+SUITE = ['tempest/tests/compute/test_keypairs.py',
+         'tempest/tests/compute/test_list_server_filters.py']
+
+
+class CassetteTest(unittest.TestCase):
+
+    """
+    Records a small suite against tools/fake_cloud.py, then replays it
+    with the fake stopped
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        fake_cloud = imp.load_source('fake_cloud', os.path.join(
+            TOP_DIR, 'tools', 'fake_cloud.py'))
+        app = fake_cloud.FakeCloud(build_time=0.2, action_time=0.2,
+                                   delete_time=0.1, image_time=0.2,
+                                   volume_time=0.2)
+        cls.server = fake_cloud.start_server(app)
+        cls.conf_dir = tempfile.mkdtemp()
+        cls.cassette_file = os.path.join(cls.conf_dir, 'tempest.cassette')
+
+        conf = ConfigParser.RawConfigParser()
+        conf.read(os.path.join(TOP_DIR, 'etc', 'tempest.conf.sample'))
+        conf.set('identity', 'host', '127.0.0.1')
+        conf.set('identity', 'port', str(cls.server.server_port))
+        conf.set('compute', 'allow_tenant_isolation', 'false')
+        conf.set('compute', 'image_ref', fake_cloud.IMAGE_REF)
+        conf.set('compute', 'image_ref_alt', fake_cloud.IMAGE_REF_ALT)
+        conf.set('compute', 'build_interval', '0.1')
+        conf.set('compute', 'build_timeout', '30')
+        conf.set('http', 'cassette_file', cls.cassette_file)
+        cls.conf = conf
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.conf_dir)
+
+    def _run_suite(self, mode):
+        self.conf.set('http', 'cassette_mode', mode)
+        with open(os.path.join(self.conf_dir, 'tempest.conf'), 'w') as f:
+            self.conf.write(f)
+        env = dict(os.environ, TEMPEST_CONFIG_DIR=self.conf_dir,
+                   TEMPEST_CONFIG='tempest.conf')
+        process = subprocess.Popen([sys.executable, '-m', 'nose'] + SUITE,
+                                   cwd=TOP_DIR, env=env,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT)
+        output = process.communicate()[0]
+        self.assertEqual(0, process.returncode,
+                         "%s run failed:\n%s" % (mode, output))
+        # e.g. "Ran 12 tests in 3.456s"
+        summary = [line for line in output.splitlines()
+                   if line.startswith('Ran ')]
+        return summary[-1].split(' in ')[0]
+
+    @attr(type='positive')
+    def test_replay_reproduces_recording(self):
+        """A replay of a recorded suite runs the same tests and passes"""
+        recorded = self._run_suite('record')
+        self.server.shutdown()
+        replayed = self._run_suite('replay')
+        self.assertEqual(recorded, replayed)
@@ -0,0 +1,62 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack, LLC
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Print the daily p50/p95 of a status transition from the database written
+by the waiters when [compute] telemetry_file is set, e.g.
+
+    python tools/telemetry_report.py tempest-telemetry.db --days 56
+"""
+
+import optparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from tempest.common import telemetry
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options] DATABASE')
+    parser.add_option('--type', default='server',
+                      help='server, volume or image')
+    parser.add_option('--from', dest='from_status', default='BUILD')
+    parser.add_option('--to', dest='to_status', default='ACTIVE')
+    parser.add_option('--days', type='int', default=28)
+    parser.add_option('--image', help='only servers of this image_ref')
+    parser.add_option('--flavor', help='only servers of this flavor_ref')
+    options, args = parser.parse_args()
+    if len(args) != 1:
+        parser.error('A database is required')
+
+    store = telemetry.TelemetryStore(args[0])
+    rows = store.trend(options.type, options.from_status, options.to_status,
+                       options.days, image_ref=options.image,
+                       flavor_ref=options.flavor)
+    store.close()
+
+    print "%s %s -> %s, last %d days" % (options.type, options.from_status,
+                                         options.to_status, options.days)
+    print "%-10s %7s %9s %9s" % ('day', 'count', 'p50 (s)', 'p95 (s)')
+    for day, count, p50, p95 in rows:
+        print "%-10s %7d %9.1f %9.1f" % (day, count, p50, p95)
+
+
+if __name__ == '__main__':
+    main()